@@ -0,0 +1,36 @@
+"""
+Atomic file replacement.
+
+The new content is written to a temporary file in the target's directory and
+renamed over the target, so readers (a starting server, Lmod, a concurrent
+build) only ever see the old file or the complete new one.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Union
+
+
+@contextmanager
+def atomic_write(path: Union[str, Path], mode: str = "w") -> Iterator[IO]:
+    """
+    Open a temporary file to be renamed over `path`.
+
+    On a clean exit the file is made world-readable (0644) and replaces
+    `path`; on an exception it is removed and `path` is left as it was.
+
+    Raises:
+        OSError: If the temporary file cannot be created (e.g. PermissionError)
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
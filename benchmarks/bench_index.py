@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+BioFinder index benchmarks
+
+Generates synthetic copies of the data files at several multiples of the real
+catalog, then measures for each scale, in fresh processes:
+
+- cold startup from the raw files (YAML/JSON parse vs index build);
+- startup from the compiled snapshot and the resulting peak RSS;
+- per-query latency percentiles of every MCP tool, rendered as call_tool
+  renders them (without the response cache), and of the BioFinderIndex
+  methods behind them.
+
+Results can be saved as a baseline and later runs compared against it:
+
+    python3 benchmarks/bench_index.py --scales 1,10 --save-baseline
+    python3 benchmarks/bench_index.py --scales 1,10      # exits 1 on regression
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+import yaml
+
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_WORK_DIR = BENCH_DIR / "data"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+METADATA_NAME = "toolfinder_meta.yaml"
+CACHE_NAME = "galaxy_singularity_cache.json.gz"
+
+# Metadata fields holding a tool identifier; copies get a suffix on each so
+# every copy is a distinct tool (see biofinder_server.ALIAS_FIELDS)
+ALIAS_FIELDS = ('id', 'name', 'biotools', 'biocontainers')
+
+# Metrics checked against the baseline, by key suffix. One regresses when it
+# exceeds the baseline by more than the tolerance and by more than this
+# absolute floor (latencies in µs, times in s, memory in MB), so that noise on
+# tiny numbers is not flagged. p99 and max latencies are reported but not
+# gated: with a few hundred samples each is one or a handful of outliers.
+REGRESSION_FLOORS = {'p50_us': 20.0, 'p90_us': 20.0, '_s': 0.05, '_mb': 10.0}
+
+DESCRIPTIONS = [
+    "quality control", "sequence alignment", "read mapping", "variant calling",
+    "genome assembly", "rna-seq differential expression", "count data from scrna",
+    "phylogenetic tree", "protein structure prediction", "metagenomics taxonomic profiling",
+    "peak calling chip-seq", "multiple sequence alignment", "gene prediction",
+    "adapter trimming", "methylation analysis", "copy number variation",
+    "long read polishing", "k-mer counting", "sequence similarity search", "format conversion",
+]
+
+
+def copy_suffix(copy: int) -> str:
+    """Name suffix of the n-th synthetic copy; the first copy keeps real names."""
+    return f"-x{copy}" if copy else ""
+
+
+def generate_dataset(scale: int, out_dir: Path, source_dir: Path = REPO_DIR):
+    """
+    Write `scale` copies of the real metadata and container cache to out_dir.
+
+    Copies differ only in their tool names, so the distribution of versions per
+    tool, tag shapes and description text match the real catalog.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    with open(source_dir / METADATA_NAME) as f:
+        metadata = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    copies = []
+    for copy in range(scale):
+        suffix = copy_suffix(copy)
+        for entry in metadata:
+            entry = dict(entry)
+            for field in ALIAS_FIELDS:
+                if isinstance(entry.get(field), str):
+                    entry[field] += suffix
+            copies.append(entry)
+    with open(out_dir / METADATA_NAME, "w") as f:
+        yaml.dump(copies, f, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper))
+    del metadata, copies
+
+    with gzip.open(source_dir / CACHE_NAME, "rt") as f:
+        cache = json.load(f)
+    root = cache['cvmfs_root']
+    tool_names = set()
+    count = 0
+    # Streamed entry by entry: at 50x the entry dicts would not fit in memory twice
+    with gzip.open(out_dir / CACHE_NAME, "wt", compresslevel=1) as f:
+        f.write(json.dumps({'generated_at': cache['generated_at'], 'cvmfs_root': root})[:-1])
+        f.write(', "entries": [')
+        for copy in range(scale):
+            suffix = copy_suffix(copy)
+            for entry in cache['entries']:
+                tool_name = entry['tool_name'] + suffix
+                entry_name = f"{tool_name}:{entry['tag']}" if entry['tag'] else tool_name
+                f.write(", " if count else "")
+                json.dump({
+                    'entry_name': entry_name,
+                    'tool_name': tool_name,
+                    'tag': entry['tag'],
+                    'path': f"{root}/{entry_name}",
+                    'size_bytes': entry['size_bytes'],
+                    'mtime': entry['mtime'],
+                }, f)
+                tool_names.add(tool_name)
+                count += 1
+        f.write(f'], "entry_count": {count}, "tool_names": ')
+        json.dump(sorted(tool_names), f)
+        f.write("}")
+
+
+def percentiles(samples_ns: Sequence[int]) -> Dict[str, float]:
+    """p50/p90/p99/max of nanosecond samples, in microseconds."""
+    ordered = sorted(samples_ns)
+    def pick(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] / 1000
+    return {'p50_us': pick(0.50), 'p90_us': pick(0.90), 'p99_us': pick(0.99), 'max_us': ordered[-1] / 1000}
+
+
+def time_calls(call: Callable[[Any], Any], inputs: Sequence[Any], rounds: int) -> Dict[str, float]:
+    """Latency percentiles of call(x) over every input, after one warm-up pass."""
+    for x in inputs:
+        call(x)
+    samples = []
+    for _ in range(rounds):
+        for x in inputs:
+            start = time.perf_counter_ns()
+            call(x)
+            samples.append(time.perf_counter_ns() - start)
+    return percentiles(samples)
+
+
+def make_queries(idx, count: int, seed: int) -> Dict[str, List[Any]]:
+    """A reproducible query mix drawn from the index being measured."""
+    rng = random.Random(seed)
+    container_tools = sorted(idx.container_index)
+    meta_ids = [entry['id'] for entry in idx.metadata if entry.get('id')]
+
+    def typo(name: str) -> str:
+        i = rng.randrange(len(name))
+        return name[:i] + rng.choice("aeiourst") + name[i + 1:]
+
+    names = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.6:
+            names.append(rng.choice(container_tools))
+        elif roll < 0.8:
+            names.append(rng.choice(meta_ids))
+        elif roll < 0.9:
+            names.append(typo(rng.choice(container_tools)))
+        else:
+            names.append("".join(rng.choice("bcdfghjklmnpqrstvwxz") for _ in range(8)))
+
+    return {
+        'names': names,
+        'batches': [rng.sample(names, min(20, len(names))) for _ in range(max(1, count // 20))],
+        'descriptions': [rng.choice(DESCRIPTIONS) for _ in range(count)],
+        'prefixes': [rng.choice(container_tools)[:rng.randint(1, 4)] for _ in range(count)],
+        'offsets': [rng.randrange(max(1, len(idx.catalog) - 50)) for _ in range(count)],
+    }
+
+
+def measure_cold(data_dir: Path) -> Dict[str, Any]:
+    """Child process: startup from the raw data files; writes the snapshot."""
+    import biofinder_server
+    from biofinder_server import BioFinderIndex
+    from metrics import peak_rss_bytes
+
+    start = time.perf_counter()
+    idx = BioFinderIndex()
+    idx.load_sources()
+    load_s = time.perf_counter() - start
+    # MiB; VmHWM, since a child would inherit the parent's ru_maxrss
+    cold_peak_rss_mb = peak_rss_bytes() / 2 ** 20
+    timings = idx.load_timings
+
+    idx.save_snapshot(biofinder_server.SNAPSHOT_FILE, biofinder_server.source_checksums())
+    return {
+        'metadata_entries': len(idx.metadata),
+        'container_entries': len(idx.singularity_entries),
+        'cold_load_s': load_s,
+        'yaml_parse_s': timings['yaml_parse_s'],
+        'json_parse_s': timings['json_parse_s'],
+        'build_indexes_s': timings['build_indexes_s'],
+        'cold_peak_rss_mb': cold_peak_rss_mb,
+        'snapshot_file_mb': biofinder_server.SNAPSHOT_FILE.stat().st_size / 1e6,
+    }
+
+
+def measure_warm(data_dir: Path, query_count: int, rounds: int, seed: int) -> Dict[str, Any]:
+    """Child process: startup from the snapshot, then query latencies."""
+    from biofinder_server import BioFinderIndex, render_tool_response
+    from metrics import peak_rss_bytes
+
+    start = time.perf_counter()
+    idx = BioFinderIndex()
+    idx.load_data()
+    load_s = time.perf_counter() - start
+    warm_peak_rss_mb = peak_rss_bytes() / 2 ** 20
+
+    queries = make_queries(idx, query_count, seed)
+
+    def tool(name: str, make_args: Callable[[Any], Dict[str, Any]]) -> Callable[[Any], Any]:
+        return lambda x: render_tool_response(idx, name, make_args(x))
+
+    latencies = {
+        'find_tool': time_calls(tool("find_tool", lambda n: {"tool_name": n}), queries['names'], rounds),
+        'find_tool_json': time_calls(
+            tool("find_tool", lambda n: {"tool_name": n, "format": "json"}), queries['names'], rounds),
+        'find_tools': time_calls(tool("find_tools", lambda b: {"tool_names": b}), queries['batches'], rounds),
+        'search_by_function': time_calls(
+            tool("search_by_function", lambda d: {"description": d}), queries['descriptions'], rounds),
+        'get_container_versions': time_calls(
+            tool("get_container_versions", lambda n: {"tool_name": n}), queries['names'], rounds),
+        'list_available_tools': time_calls(tool("list_available_tools", lambda _: {}), queries['offsets'], rounds),
+        'autocomplete': time_calls(tool("autocomplete", lambda p: {"prefix": p}), queries['prefixes'], rounds),
+        'search_tool': time_calls(lambda n: idx.search_tool(n, limit=4), queries['names'], rounds),
+        '_search_metadata': time_calls(lambda d: idx._search_metadata(d), queries['descriptions'], rounds),
+        'list_all_tools': time_calls(lambda o: idx.list_all_tools(50, o), queries['offsets'], rounds),
+    }
+    return {
+        'snapshot_load_s': load_s,
+        'peak_rss_mb': warm_peak_rss_mb,
+        'latency': latencies,
+    }
+
+
+def run_child(phase: str, data_dir: Path, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run one measurement phase in a fresh interpreter, so RSS and caches start clean."""
+    env = dict(os.environ, BIOFINDER_DATA_DIR=str(data_dir))
+    command = [
+        sys.executable, __file__, "--child", phase, "--data-dir", str(data_dir),
+        "--queries", str(args.queries), "--rounds", str(args.rounds), "--seed", str(args.seed),
+    ]
+    proc = subprocess.run(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{phase} benchmark failed in {data_dir} (exit {proc.returncode})")
+    return json.loads(proc.stdout)
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """{'x1': {'latency': {'find_tool': {'p50_us': 1}}}} -> {'x1.latency.find_tool.p50_us': 1}"""
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Metrics of results that regressed against the baseline, formatted."""
+    current = flatten(results)
+    regressions = []
+    for key, old in flatten(baseline).items():
+        new = current.get(key)
+        floor = next((f for suffix, f in REGRESSION_FLOORS.items() if key.endswith(suffix)), None)
+        if new is None or floor is None or not old:
+            continue
+        if new > old * (1 + tolerance) and new - old > floor:
+            regressions.append(f"{key}: {old:.3f} -> {new:.3f} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def format_results(results: Dict[str, Any]) -> str:
+    """Startup and latency tables, one column per scale."""
+    scales = list(results)
+    lines = [f"{'':<28}" + "".join(f"{scale:>14}" for scale in scales)]
+    for metric in ('metadata_entries', 'container_entries', 'cold_load_s', 'yaml_parse_s', 'json_parse_s',
+                   'build_indexes_s',
+                   'cold_peak_rss_mb', 'snapshot_file_mb', 'snapshot_load_s', 'peak_rss_mb'):
+        values = [results[scale][metric] for scale in scales]
+        lines.append(f"{metric:<28}" + "".join(
+            f"{value:>14}" if isinstance(value, int) else f"{value:>14.3f}" for value in values
+        ))
+    lines.append("")
+    lines.append(f"{'latency p50 / p99 (µs)':<28}" + "".join(f"{scale:>14}" for scale in scales))
+    for name in results[scales[0]]['latency']:
+        cells = "".join(
+            f"{results[scale]['latency'][name]['p50_us']:>7.0f}/{results[scale]['latency'][name]['p99_us']:<6.0f}"
+            for scale in scales
+        )
+        lines.append(f"{name:<28}{cells}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark BioFinder index build and queries at scale.")
+    parser.add_argument("--scales", default="1,10", help="comma-separated catalog multiples, e.g. 1,10,50 (default 1,10)")
+    parser.add_argument("--work-dir", type=Path, default=DEFAULT_WORK_DIR, help="where synthetic datasets are kept")
+    parser.add_argument("--regenerate", action="store_true", help="rewrite synthetic datasets that already exist")
+    parser.add_argument("--queries", type=int, default=200, help="queries per tool (default 200)")
+    parser.add_argument("--rounds", type=int, default=3, help="timed passes over the queries (default 3)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (default 0.25)")
+    parser.add_argument("--output", type=Path, help="also write the results as JSON")
+    parser.add_argument("--child", choices=("cold", "warm"), help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", type=Path, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+
+    if args.child:
+        sys.path.insert(0, str(REPO_DIR))
+        if args.child == "cold":
+            result = measure_cold(args.data_dir)
+        else:
+            result = measure_warm(args.data_dir, args.queries, args.rounds, args.seed)
+        json.dump(result, sys.stdout)
+        return 0
+
+    results = {}
+    for scale in (int(s) for s in args.scales.split(",")):
+        data_dir = args.work_dir / f"x{scale}"
+        if args.regenerate or not (data_dir / CACHE_NAME).exists():
+            print(f"Generating {scale}x dataset in {data_dir}...", file=sys.stderr)
+            generate_dataset(scale, data_dir)
+        print(f"Benchmarking {scale}x...", file=sys.stderr)
+        results[f"x{scale}"] = {**run_child("cold", data_dir, args), **run_child("warm", data_dir, args)}
+
+    print(format_results(results))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regressions against {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Replay a recorded query log against BioFinder MCP servers
+
+Reads a JSONL log written by a server started with BIOFINDER_QUERY_LOG, starts
+one or more servers over stdio, and sends the logged tool calls through them
+with a fixed number of requests in flight. Reports throughput and latency
+percentiles, overall and per tool, as seen by the client (JSON-RPC round-trip
+included), and how many answers differ in size from the recorded ones.
+
+    BIOFINDER_QUERY_LOG=/tmp/queries.jsonl ./biofinder_server.py --socket
+    python3 benchmarks/replay.py /tmp/queries.jsonl --servers 4 --concurrency 16
+    python3 benchmarks/replay.py /tmp/queries.jsonl --server ../other-checkout/biofinder_server.py
+
+Servers inherit this process's environment, so BIOFINDER_* settings apply
+(e.g. BIOFINDER_RESPONSE_CACHE_MB=0 to measure uncached rendering).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_SERVER = REPO_DIR / "biofinder_server.py"
+
+
+def read_log(path: Path, tools: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Records of a query log, optionally only those of some tools. `reload` is never replayed."""
+    records = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record['tool'] == "reload" or (tools and record['tool'] not in tools):
+                continue
+            records.append(record)
+    return records
+
+
+def percentiles(latencies_ms: List[float]) -> Dict[str, float]:
+    """p50/p90/p99/max in milliseconds."""
+    if not latencies_ms:
+        return {'p50_ms': 0.0, 'p90_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+    ordered = sorted(latencies_ms)
+    def pick(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+    return {'p50_ms': pick(0.50), 'p90_ms': pick(0.90), 'p99_ms': pick(0.99), 'max_ms': ordered[-1]}
+
+
+async def replay(records: List[Dict[str, Any]], server: Path, servers: int, concurrency: int,
+                 verbose: bool = False) -> Dict[str, Any]:
+    """
+    Send every record's tool call through `servers` stdio servers.
+
+    `concurrency` workers share the records in log order; worker i uses
+    server i % servers. Each server answers one warm-up call before timing
+    starts, so index loading is not measured. Server logs are discarded
+    unless `verbose`.
+    """
+    params = StdioServerParameters(command=sys.executable, args=[str(server)], env=dict(os.environ))
+    async with AsyncExitStack() as stack:
+        errlog = sys.stderr if verbose else stack.enter_context(open(os.devnull, "w"))
+        sessions = []
+        for _ in range(servers):
+            read, write = await stack.enter_async_context(stdio_client(params, errlog=errlog))
+            session = await stack.enter_async_context(ClientSession(read, write))
+            await session.initialize()
+            sessions.append(session)
+        # Blocks until each server's index is loaded
+        await asyncio.gather(*(session.call_tool("autocomplete", {"prefix": "a", "limit": 1}) for session in sessions))
+
+        pending = iter(records)
+        samples: List[Dict[str, Any]] = []
+
+        async def worker(session: ClientSession):
+            for record in pending:
+                start = time.perf_counter()
+                try:
+                    result = await session.call_tool(record['tool'], record['arguments'])
+                    failed = bool(result.isError)
+                    chars = sum(len(content.text) for content in result.content if hasattr(content, 'text'))
+                except Exception:
+                    failed = True
+                    chars = None
+                samples.append({
+                    'tool': record['tool'],
+                    'latency_ms': (time.perf_counter() - start) * 1000,
+                    'failed': failed,
+                    'size_changed': record.get('result_chars') is not None and chars != record['result_chars'],
+                })
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(sessions[i % servers]) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    by_tool: Dict[str, List[float]] = {}
+    for sample in samples:
+        by_tool.setdefault(sample['tool'], []).append(sample['latency_ms'])
+    return {
+        'requests': len(samples),
+        'errors': sum(sample['failed'] for sample in samples),
+        'size_changed': sum(sample['size_changed'] for sample in samples),
+        'servers': servers,
+        'concurrency': concurrency,
+        'elapsed_seconds': elapsed,
+        'requests_per_second': len(samples) / elapsed if elapsed > 0 else 0.0,
+        'latency': percentiles([sample['latency_ms'] for sample in samples]),
+        'tools': {
+            tool: {'requests': len(latencies), **percentiles(latencies)}
+            for tool, latencies in sorted(by_tool.items(), key=lambda item: -len(item[1]))
+        },
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Summary line plus a per-tool latency table."""
+    latency = report['latency']
+    lines = [
+        f"Replayed {report['requests']} requests through {report['servers']} server(s) "
+        f"at concurrency {report['concurrency']} in {report['elapsed_seconds']:.2f} s "
+        f"({report['requests_per_second']:.0f} req/s)",
+        f"  Errors: {report['errors']}",
+        f"  Answers differing in size from the log: {report['size_changed']}",
+        f"  Latency p50 {latency['p50_ms']:.2f} ms, p90 {latency['p90_ms']:.2f} ms, "
+        f"p99 {latency['p99_ms']:.2f} ms, max {latency['max_ms']:.2f} ms",
+        "",
+        f"{'tool':<26}{'requests':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+    ]
+    for tool, stats in report['tools'].items():
+        lines.append(
+            f"{tool:<26}{stats['requests']:>10}{stats['p50_ms']:>10.2f}{stats['p90_ms']:>10.2f}"
+            f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay a BioFinder query log against MCP servers over stdio.")
+    parser.add_argument("log", type=Path, help="JSONL query log (BIOFINDER_QUERY_LOG)")
+    parser.add_argument("--server", type=Path, default=DEFAULT_SERVER, help="biofinder_server.py to start")
+    parser.add_argument("--servers", type=int, default=1, help="server processes to start (default 1)")
+    parser.add_argument("--concurrency", type=int, default=1, help="requests in flight in total (default 1)")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the log this many times (default 1)")
+    parser.add_argument("--limit", type=int, help="replay only the first N records")
+    parser.add_argument("--tool", action="append", dest="tools", help="replay only this tool (repeatable)")
+    parser.add_argument("--output", type=Path, help="also write the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="show the servers' logs on stderr")
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    records = read_log(args.log, args.tools)[:args.limit] * max(1, args.repeat)
+    if not records:
+        print(f"No replayable records in {args.log}", file=sys.stderr)
+        return 1
+
+    report = asyncio.run(replay(records, args.server, max(1, args.servers), max(1, args.concurrency), args.verbose))
+    print(format_report(report))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    return 1 if report['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
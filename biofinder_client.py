@@ -6,30 +6,161 @@ Command-line client for querying the CVMFS-MCP server.
 """
 
 import asyncio
+import bisect
+import os
+import pwd
+import socket
+import stat
 import sys
 import json
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+try:
+    import readline
+except ImportError:  # not available on all platforms
+    readline = None
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamable_http_client
+
+from cvmfs_module_builder import (
+    DEFAULT_BUILD_WORKERS, CVMFSModuleBuilder,
+    format_build_many_output, format_build_output, format_reconcile_output, format_versions_list,
+)
+
+# Shared daemon started with `biofinder_server.py --socket` or `--http`.
+# BIOFINDER_URL (e.g. http://login1:8750/mcp) selects a TCP daemon; otherwise
+# the Unix sockets are tried in order: $BIOFINDER_SOCKET if set, else the
+# site-wide service socket and then a personal daemon in $XDG_RUNTIME_DIR.
+# Must match SERVICE_SOCKET/DEFAULT_SOCKET/HTTP_PATH in biofinder_server.py.
+# BIOFINDER_NO_DAEMON=1 always spawns a stdio server.
+DAEMON_URL = os.environ.get("BIOFINDER_URL")
+DAEMON_SOCKETS = [os.environ["BIOFINDER_SOCKET"]] if os.environ.get("BIOFINDER_SOCKET") else [
+    "/run/biofinder/biofinder.sock",
+    *([os.path.join(os.environ["XDG_RUNTIME_DIR"], "biofinder.sock")] if os.environ.get("XDG_RUNTIME_DIR") else []),
+]
+DAEMON_HTTP_PATH = "/mcp"
+DAEMON_CONNECT_TIMEOUT = 0.5
+
+# A socket is only trusted if owned by root, the current user, or the account
+# named in BIOFINDER_SOCKET_OWNER (the service user of a site-wide daemon).
+# Anyone else's socket could be a fake daemon handing out wrong paths.
+DAEMON_SOCKET_OWNER = os.environ.get("BIOFINDER_SOCKET_OWNER")
+
+
+def _daemon_address() -> Optional[Tuple[str, Optional[str]]]:
+    """(URL, Unix socket path or None) of a reachable shared daemon, or None."""
+    if os.environ.get("BIOFINDER_NO_DAEMON"):
+        return None
+
+    if DAEMON_URL:
+        parsed = urlparse(DAEMON_URL)
+        try:
+            socket.create_connection((parsed.hostname, parsed.port or 80), timeout=DAEMON_CONNECT_TIMEOUT).close()
+        except OSError:
+            return None
+        return DAEMON_URL, None
+
+    for socket_path in DAEMON_SOCKETS:
+        if not _trusted_socket(socket_path):
+            continue
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(DAEMON_CONNECT_TIMEOUT)
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            continue  # stale socket file left by a daemon that exited
+        finally:
+            sock.close()
+        return f"http://localhost{DAEMON_HTTP_PATH}", socket_path
+
+    return None
+
+
+def _trusted_socket(socket_path: str) -> bool:
+    """True if `socket_path` is a socket owned by a trusted user (see DAEMON_SOCKET_OWNER)."""
+    try:
+        st = os.stat(socket_path)
+    except OSError:
+        return False
+    if not stat.S_ISSOCK(st.st_mode):
+        return False
+
+    trusted = {0, os.getuid()}
+    if DAEMON_SOCKET_OWNER:
+        try:
+            trusted.add(pwd.getpwnam(DAEMON_SOCKET_OWNER).pw_uid)
+        except KeyError:
+            pass
+    if st.st_uid not in trusted:
+        print(f"Warning: ignoring daemon socket {socket_path} owned by uid {st.st_uid}", file=sys.stderr)
+        return False
+    return True
 
-from cvmfs_module_builder import CVMFSModuleBuilder, format_versions_list, format_build_output
 
+@asynccontextmanager
+async def connect() -> AsyncIterator[ClientSession]:
+    """Open an initialized MCP session.
 
-async def query_tool(session: ClientSession, tool_name: str):
+    Uses the shared daemon when one is reachable, so the command does not pay
+    for loading the index. Otherwise spawns biofinder_server.py over stdio.
+    """
+    daemon = _daemon_address()
+    if daemon:
+        url, socket_path = daemon
+        transport = httpx.AsyncHTTPTransport(uds=socket_path) if socket_path else None
+        async with httpx.AsyncClient(transport=transport, timeout=httpx.Timeout(30, read=300)) as http_client:
+            async with streamable_http_client(url, http_client=http_client) as (read, write, _):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    yield session
+        return
+
+    # Locate server script
+    server_script = Path(__file__).parent / "biofinder_server.py"
+    
+    if not server_script.exists():
+        print(f"Error: Server script not found at {server_script}")
+        sys.exit(1)
+    
+    # Server parameters. Pass our whole environment: the MCP default only
+    # keeps a few variables (HOME, PATH, ...), which would drop every
+    # BIOFINDER_* server setting
+    server_params = StdioServerParameters(
+        command="python3",
+        args=[str(server_script)],
+        env=dict(os.environ)
+    )
+    
+    # Connect to server
+    async with stdio_client(server_params) as (read, write):
+        async with ClientSession(read, write) as session:
+            # Initialize
+            await session.initialize()
+            yield session
+
+
+async def query_tool(session: ClientSession, tool_name: str, output_format: str = "text"):
     """Query for a specific tool."""
-    result = await session.call_tool("find_tool", {"tool_name": tool_name})
+    result = await session.call_tool("find_tool", {"tool_name": tool_name, "format": output_format})
     
     for content in result.content:
         if hasattr(content, 'text'):
             print(content.text)
 
 
-async def search_function(session: ClientSession, description: str, limit: int = 10):
-    """Search by function/description."""
+async def query_tools(session: ClientSession, tool_names: List[str], include_versions: bool = False,
+                      output_format: str = "text"):
+    """Query for many tools in a single request."""
     result = await session.call_tool(
-        "search_by_function",
-        {"description": description, "limit": limit}
+        "find_tools",
+        {"tool_names": tool_names, "include_versions": include_versions, "format": output_format}
     )
     
     for content in result.content:
@@ -37,11 +168,31 @@ async def search_function(session: ClientSession, description: str, limit: int =
             print(content.text)
 
 
-async def list_tools(session: ClientSession, limit: int = 50):
-    """List available tools."""
+def read_tool_names(source: Optional[str]) -> List[str]:
+    """
+    Read tool names from a file, or from stdin if `source` is None or "-".
+
+    Names are separated by whitespace or commas; text after '#' is ignored,
+    so a requirements-style list with comments works as is.
+    """
+    if source in (None, "-"):
+        text = sys.stdin.read()
+    else:
+        text = Path(source).read_text()
+
+    names = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0]
+        names.extend(name for name in line.replace(",", " ").split())
+    return names
+
+
+async def search_function(session: ClientSession, description: str, limit: int = 10,
+                          output_format: str = "text"):
+    """Search by function/description."""
     result = await session.call_tool(
-        "list_available_tools",
-        {"limit": limit}
+        "search_by_function",
+        {"description": description, "limit": limit, "format": output_format}
     )
     
     for content in result.content:
@@ -49,11 +200,24 @@ async def list_tools(session: ClientSession, limit: int = 50):
             print(content.text)
 
 
-async def get_versions(session: ClientSession, tool_name: str):
-    """Get all versions of a tool."""
+async def list_tools(session: ClientSession, limit: int = 50, output_format: str = "text",
+                     cursor: Optional[str] = None):
+    """List available tools, from `cursor` on."""
+    arguments = {"limit": limit, "format": output_format}
+    if cursor:
+        arguments["cursor"] = cursor
+    result = await session.call_tool("list_available_tools", arguments)
+    
+    for content in result.content:
+        if hasattr(content, 'text'):
+            print(content.text)
+
+
+async def autocomplete(session: ClientSession, prefix: str, limit: int = 20, output_format: str = "text"):
+    """Complete a partial tool name."""
     result = await session.call_tool(
-        "get_container_versions",
-        {"tool_name": tool_name}
+        "autocomplete",
+        {"prefix": prefix, "limit": limit, "format": output_format}
     )
     
     for content in result.content:
@@ -61,6 +225,21 @@ async def get_versions(session: ClientSession, tool_name: str):
             print(content.text)
 
 
+async def get_versions(session: ClientSession, tool_name: str, output_format: str = "text",
+                       limit: Optional[int] = None, cursor: Optional[str] = None):
+    """Get all versions of a tool, or one page of them."""
+    arguments = {"tool_name": tool_name, "format": output_format}
+    if limit:
+        arguments["limit"] = limit
+    if cursor:
+        arguments["cursor"] = cursor
+    result = await session.call_tool("get_container_versions", arguments)
+    
+    for content in result.content:
+        if hasattr(content, 'text'):
+            print(content.text)
+
+
 def build_module(tool_spec: str) -> bool:
     """Build an Lmod module for a tool from CVMFS.
     
@@ -113,14 +292,14 @@ def build_module(tool_spec: str) -> bool:
         available_versions = builder.list_versions(tool_name)
         
         if not available_versions:
-            print(f"Error: Tool '{tool_name}' not found in CVMFS")
+            print(f"Error: Tool '{tool_name}' not found in the container cache")
             return False
         
         # Build the module
         final_tool, final_version, module_file = builder.build_module(tool_spec)
         
         # Refresh module cache
-        success, output = builder._refresh_module_cache()
+        success, output = builder._refresh_module_cache([module_file])
         
         # Display results
         output_text = format_build_output(
@@ -135,6 +314,126 @@ def build_module(tool_spec: str) -> bool:
         return False
 
 
+def _needs_module_sudo() -> bool:
+    """True if the module directory is not writable by the current user."""
+    module_dir = CVMFSModuleBuilder.LMOD_MODULES_PATH
+    return not os.access(module_dir, os.W_OK) if module_dir.exists() else True
+
+
+def _rerun_with_sudo(command: str, args: List[str]) -> bool:
+    """Re-run a whole biofinder command once under sudo; stdin is inherited."""
+    import subprocess
+
+    biofinder_path = Path(__file__).parent / "biofinder"
+    cmd = [
+        "sudo", "-E", "env", f"PATH={os.environ['PATH']}",
+        str(biofinder_path), command, *args
+    ]
+    try:
+        print(f"🔑 Running with sudo: {command} {' '.join(args)}")
+        return subprocess.run(cmd, check=False).returncode == 0
+    except KeyboardInterrupt:
+        print("\n❌ Build cancelled by user")
+        return False
+
+
+def _parse_tool_specs(args: List[str], flags: Tuple[str, ...] = ()) -> Tuple[List[str], int, set]:
+    """
+    Parse `<tool[/version]> ... | - [file]` plus `--workers N` and boolean `flags`.
+
+    Returns:
+        Tuple of (tool specs, worker count, flags given)
+
+    Raises:
+        ValueError, IndexError, OSError: On bad options or an unreadable manifest
+    """
+    workers = DEFAULT_BUILD_WORKERS
+    tool_specs = []
+    given = set()
+    remaining = list(args)
+    while remaining:
+        arg = remaining.pop(0)
+        if arg == "--workers":
+            workers = int(remaining.pop(0))
+        elif arg in flags:
+            given.add(arg)
+        elif arg == "-":
+            source = remaining.pop(0) if remaining and not remaining[0].startswith("--") else None
+            tool_specs.extend(read_tool_names(source))
+        elif arg.startswith("--"):
+            raise ValueError(f"Unknown option: {arg}")
+        else:
+            tool_specs.append(arg)
+    if not tool_specs:
+        raise ValueError("No tools given")
+    return tool_specs, workers, given
+
+
+def build_many_modules(args: List[str]) -> bool:
+    """Build Lmod modules for many tools with one index load and one Lmod refresh.
+
+    Usage: build-many <tool[/version]> ... | build-many - [file] [--workers N]
+
+    Returns:
+        bool: True if every module was built, False otherwise
+    """
+    if _needs_module_sudo():
+        return _rerun_with_sudo("build-many", args)
+
+    try:
+        tool_specs, workers, _ = _parse_tool_specs(args)
+    except (IndexError, ValueError, OSError) as e:
+        print(f"Error: {e or 'missing option value'}")
+        print("Usage: build-many <tool[/version]> ... | build-many - [file] [--workers N]")
+        return False
+
+    builder = CVMFSModuleBuilder()
+    try:
+        results, refreshed, refresh_output = builder.build_many(tool_specs, workers)
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
+
+    print(format_build_many_output(results, refreshed, refresh_output))
+    return all(result['error'] is None for result in results)
+
+
+def reconcile_modules(args: List[str]) -> bool:
+    """Make the module tree match a manifest, writing only what changed.
+
+    Usage: reconcile <tool[/version]> ... | reconcile - [file]
+           [--prune] [--dry-run] [--workers N]
+
+    Returns:
+        bool: True if the tree matches the manifest afterwards (or, with
+        --dry-run, if every spec resolved), False otherwise
+    """
+    # A dry run only reads the module tree. Decide on sudo before parsing,
+    # which may consume the manifest from stdin
+    dry_run = "--dry-run" in args
+    if not dry_run and _needs_module_sudo():
+        return _rerun_with_sudo("reconcile", args)
+
+    try:
+        tool_specs, workers, given = _parse_tool_specs(args, ("--prune", "--dry-run"))
+    except (IndexError, ValueError, OSError) as e:
+        print(f"Error: {e or 'missing option value'}")
+        print("Usage: reconcile <tool[/version]> ... | reconcile - [file] [--prune] [--dry-run] [--workers N]")
+        return False
+
+    builder = CVMFSModuleBuilder()
+    try:
+        plan, refreshed, refresh_output = builder.reconcile(
+            tool_specs, prune="--prune" in given, dry_run=dry_run, workers=workers
+        )
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
+
+    print(format_reconcile_output(plan, dry_run, refreshed, refresh_output))
+    return all(item['error'] is None for item in plan)
+
+
 def list_cvmfs_versions(tool_name: str) -> None:
     """List available versions of a tool in CVMFS."""
     builder = CVMFSModuleBuilder()
@@ -151,6 +450,260 @@ def list_cvmfs_versions(tool_name: str) -> None:
         print(f"Error: {e}")
 
 
+def compile_index(force: bool = False) -> bool:
+    """Compile the raw data files into the server's index snapshot.
+
+    Returns:
+        bool: True if the snapshot is up to date afterwards, False otherwise
+    """
+    from biofinder_server import SNAPSHOT_FILE, compile_snapshot
+
+    try:
+        if compile_snapshot(force=force):
+            print(f"✅ Compiled index written to {SNAPSHOT_FILE}")
+        else:
+            print(f"Index snapshot is already up to date: {SNAPSHOT_FILE}")
+            print("Use 'compile --force' to rebuild it anyway.")
+        return True
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
+
+
+def scan_cache(args: List[str]) -> bool:
+    """Regenerate the container cache by scanning a CVMFS directory.
+
+    Usage: scan [root] [--output FILE] [--workers N] [--full] [--trust-names] [--force]
+
+    Returns:
+        bool: True if the cache was written, False otherwise
+    """
+    from biofinder_server import SINGULARITY_CACHE_FILE
+    from cvmfs_scanner import (
+        DEFAULT_CVMFS_ROOT, DEFAULT_WORKERS,
+        check_entry_count, format_scan_output, load_previous_cache, scan_cvmfs, write_cache,
+    )
+
+    root = DEFAULT_CVMFS_ROOT
+    cache_file = SINGULARITY_CACHE_FILE
+    workers = DEFAULT_WORKERS
+    full = False
+    trust_names = False
+    force = False
+
+    try:
+        remaining = list(args)
+        while remaining:
+            arg = remaining.pop(0)
+            if arg == "--output":
+                cache_file = Path(remaining.pop(0))
+            elif arg == "--workers":
+                workers = int(remaining.pop(0))
+            elif arg == "--full":
+                full = True
+            elif arg == "--trust-names":
+                trust_names = True
+            elif arg == "--force":
+                force = True
+            elif not arg.startswith("--"):
+                root = arg
+            else:
+                raise ValueError(f"Unknown option: {arg}")
+    except (IndexError, ValueError) as e:
+        print(f"Error: {e or 'missing option value'}")
+        print("Usage: scan [root] [--output FILE] [--workers N] [--full] [--trust-names] [--force]")
+        return False
+
+    try:
+        previous = load_previous_cache(cache_file)
+        print(f"Scanning {root} with {workers} workers "
+              f"({len(previous)} entries in previous cache)...")
+        cache_data, stats = scan_cvmfs(root, {} if full else previous, workers, trust_names)
+        problem = check_entry_count(stats['entries'], len(previous))
+        if problem and not force:
+            print(f"Error: {problem}; {cache_file} left unchanged. "
+                  f"Check that {root} is mounted, or pass --force to write it anyway.")
+            return False
+        write_cache(cache_data, cache_file)
+        print(format_scan_output(stats, cache_file))
+        return True
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
+
+
+def export_catalog(args: List[str]) -> bool:
+    """Write the tool catalog, or the latest container of every tool, in bulk.
+
+    Usage: export [--latest] [--format tsv|json] [--output FILE]
+
+    Loads the index locally and streams the rows to stdout or FILE.
+
+    Returns:
+        bool: True if the export was written, False otherwise
+    """
+    from biofinder_server import BioFinderIndex, export_index
+
+    latest = False
+    fmt = "tsv"
+    output = None
+
+    try:
+        remaining = list(args)
+        while remaining:
+            arg = remaining.pop(0)
+            if arg == "--latest":
+                latest = True
+            elif arg == "--format":
+                fmt = remaining.pop(0)
+            elif arg == "--output":
+                output = Path(remaining.pop(0))
+            else:
+                raise ValueError(f"Unknown option: {arg}")
+    except (IndexError, ValueError) as e:
+        print(f"Error: {e or 'missing option value'}", file=sys.stderr)
+        print("Usage: export [--latest] [--format tsv|json] [--output FILE]", file=sys.stderr)
+        return False
+
+    try:
+        idx = BioFinderIndex()
+        idx.load_data()
+        if output:
+            with open(output, "w") as f:
+                count = export_index(idx, f, latest, fmt)
+            print(f"Exported {count} rows to {output}")
+        else:
+            export_index(idx, sys.stdout, latest, fmt)
+        return True
+    except BrokenPipeError:
+        # Reader (e.g. `head`) stopped early. Point stdout at /dev/null so
+        # the flush at interpreter exit does not fail again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return True
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return False
+
+
+async def verify_cache(args: List[str]) -> bool:
+    """Check cached container paths against CVMFS.
+
+    Usage: verify [--sample N] [--workers N] [--timeout SECONDS]
+
+    Stats every cached path (or a random sample) concurrently and reports
+    images that are missing or changed, plus the age of the cache.
+
+    Returns:
+        bool: True if every checked image matched the cache, False otherwise
+    """
+    from biofinder_server import BioFinderIndex
+    from cvmfs_scanner import DEFAULT_WORKERS
+    from cvmfs_verifier import (
+        CHANGED, DEFAULT_STAT_TIMEOUT, MISSING,
+        format_verify_output, sample_rows, verify_store,
+    )
+
+    sample = None
+    workers = DEFAULT_WORKERS
+    timeout = DEFAULT_STAT_TIMEOUT
+
+    try:
+        remaining = list(args)
+        while remaining:
+            arg = remaining.pop(0)
+            if arg == "--sample":
+                sample = int(remaining.pop(0))
+            elif arg == "--workers":
+                workers = int(remaining.pop(0))
+            elif arg == "--timeout":
+                timeout = float(remaining.pop(0))
+            else:
+                raise ValueError(f"Unknown option: {arg}")
+    except (IndexError, ValueError) as e:
+        print(f"Error: {e or 'missing option value'}")
+        print("Usage: verify [--sample N] [--workers N] [--timeout SECONDS]")
+        return False
+
+    try:
+        idx = BioFinderIndex()
+        idx.load_data()
+        store = idx.singularity_entries
+        rows = sample_rows(len(store), sample)
+        print(f"Verifying {len(rows)} cached paths with {workers} workers...")
+        report = await verify_store(store, rows, workers, timeout)
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
+
+    print(format_verify_output(report, store, idx.cache_info))
+    counts = report['counts']
+    return report['root_available'] and not counts[MISSING] and not counts[CHANGED]
+
+
+class ToolCompleter:
+    """readline completer for interactive mode.
+
+    Completes command names, and tool names after commands that take one.
+    Tool names are fetched from the server once, then matched locally with
+    a binary search over the sorted names, so each Tab press costs
+    microseconds rather than a server round-trip.
+    """
+
+    COMMANDS = ["find", "search", "versions", "complete", "list", "build", "cvmfs-list", "help", "quit", "exit"]
+    TOOL_COMMANDS = {"find", "versions", "complete", "build", "cvmfs-list"}
+
+    def __init__(self, tool_names: List[str]):
+        names = {name.lower(): name for name in tool_names}
+        self.keys = sorted(names)
+        self.names = [names[key] for key in self.keys]
+        self.matches: List[str] = []
+
+    def candidates(self, line: str, text: str) -> List[str]:
+        """All completions for `text`, the word being typed in `line`."""
+        words = line.split()
+        if not words or (len(words) == 1 and not line.endswith(" ")):
+            return [command + " " for command in self.COMMANDS if command.startswith(text.lower())]
+        if words[0].lower() not in self.TOOL_COMMANDS:
+            return []
+
+        prefix = text.lower()
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\U0010ffff", lo)
+        return self.names[lo:hi]
+
+    def complete(self, text: str, state: int) -> Optional[str]:
+        """readline entry point: called with state 0, 1, 2, ... until None."""
+        if state == 0:
+            self.matches = self.candidates(readline.get_line_buffer(), text)
+        return self.matches[state] if state < len(self.matches) else None
+
+
+async def setup_completion(session: ClientSession):
+    """Enable Tab completion of commands and tool names, if readline is available."""
+    if readline is None:
+        return
+
+    try:
+        result = await session.read_resource("biofinder://metadata")
+    except Exception as e:
+        print(f"(Tab completion of tool names unavailable: {e})")
+        return
+    tool_names = [
+        line
+        for content in result.contents if hasattr(content, 'text')
+        for line in content.text.splitlines() if line
+    ]
+
+    completer = ToolCompleter(tool_names)
+    readline.set_completer(completer.complete)
+    # Tool names contain '-', ':' and '/', so only split words on whitespace
+    readline.set_completer_delims(" \t\n")
+    if "libedit" in (readline.__doc__ or ""):
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+
+
 async def interactive_mode(session: ClientSession):
     """Interactive query mode."""
     print("\n=== BioFinder - Interactive Mode ===")
@@ -158,12 +711,16 @@ async def interactive_mode(session: ClientSession):
     print("  find <tool_name>          - Find a specific tool")
     print("  search <description>      - Search by function/description")
     print("  versions <tool_name>      - List all versions of a tool")
+    print("  complete <prefix>         - List tool names starting with a prefix")
     print("  list [limit]              - List available tools")
     print("  build <tool[/version]>    - Build Lmod module from CVMFS")
     print("  cvmfs-list <tool_name>    - List CVMFS versions of a tool")
     print("  help                      - Show this help")
     print("  quit/exit                 - Exit interactive mode")
+    print("Press Tab to complete commands and tool names.")
     print()
+
+    await setup_completion(session)
     
     while True:
         try:
@@ -180,6 +737,7 @@ async def interactive_mode(session: ClientSession):
                 print("  find <tool_name>          - Find a specific tool")
                 print("  search <description>      - Search by function/description")
                 print("  versions <tool_name>      - List all versions of a tool")
+                print("  complete <prefix>         - List tool names starting with a prefix")
                 print("  list [limit]              - List available tools")
                 print("  build <tool[/version]>    - Build Lmod module from CVMFS")
                 print("  cvmfs-list <tool_name>    - List CVMFS versions of a tool")
@@ -196,6 +754,8 @@ async def interactive_mode(session: ClientSession):
                 await search_function(session, parts[1])
             elif command == "versions" and len(parts) > 1:
                 await get_versions(session, parts[1])
+            elif command == "complete" and len(parts) > 1:
+                await autocomplete(session, parts[1])
             elif command == "list":
                 limit = 10
                 if len(parts) > 1 and parts[1].isdigit():
@@ -228,25 +788,47 @@ async def main():
         print("BioFinder MCP Client")
         print("\nUsage:")
         print("  biofinder_client.py find <tool_name>")
+        print("  biofinder_client.py find - [file] [--versions]")
         print("  biofinder_client.py search <description>")
-        print("  biofinder_client.py versions <tool_name>")
-        print("  biofinder_client.py list [limit]")
+        print("  biofinder_client.py versions <tool_name> [limit] [cursor]")
+        print("  biofinder_client.py complete <prefix> [limit]")
+        print("  biofinder_client.py list [limit] [cursor]")
         print("  biofinder_client.py build <tool[/version]>")
+        print("  biofinder_client.py build-many <tool[/version]> ... | build-many - [file] [--workers N]")
+        print("  biofinder_client.py reconcile <tool[/version]> ... | reconcile - [file] [--prune] [--dry-run]")
         print("  biofinder_client.py cvmfs-list <tool_name>")
+        print("  biofinder_client.py compile [--force]")
+        print("  biofinder_client.py scan [root] [--output FILE] [--workers N] [--full] [--trust-names] [--force]")
+        print("  biofinder_client.py export [--latest] [--format tsv|json] [--output FILE]")
+        print("  biofinder_client.py verify [--sample N] [--workers N] [--timeout SECONDS]")
         print("  biofinder_client.py interactive")
+        print("\nAdd --json to find, versions, search, complete or list for compact JSON output.")
         print("\nExamples:")
         print("  biofinder_client.py find fastqc")
+        print("  biofinder_client.py find - < workflow_tools.txt")
         print("  biofinder_client.py search 'quality control'")
         print("  biofinder_client.py search 'count data from scrna'")
         print("  biofinder_client.py versions samtools")
+        print("  biofinder_client.py versions samtools --json")
+        print("  biofinder_client.py complete bioconductor-de")
         print("  biofinder_client.py list 100")
         print("  biofinder_client.py build samtools")
         print("  biofinder_client.py build samtools/1.21")
+        print("  biofinder_client.py build-many samtools fastqc bwa/0.7.19--h577a1d6_1")
+        print("  biofinder_client.py build-many - modules.txt")
+        print("  biofinder_client.py reconcile - modules.txt --prune --dry-run")
         print("  biofinder_client.py cvmfs-list samtools")
+        print("  biofinder_client.py compile")
+        print("  biofinder_client.py export --latest --format json --output latest.json")
+        print("  biofinder_client.py verify --sample 1000")
         print("  biofinder_client.py interactive")
         sys.exit(1)
     
     # Process command
+    output_format = "text"
+    if "--json" in sys.argv:
+        sys.argv.remove("--json")
+        output_format = "json"
     command = sys.argv[1].lower()
     
     # Handle CVMFS commands that don't need the MCP server
@@ -254,54 +836,93 @@ async def main():
         build_module(sys.argv[2])
         return
     
-    elif command == "cvmfs-list" and len(sys.argv) > 2:
-        list_cvmfs_versions(sys.argv[2])
+    elif command == "build-many" and len(sys.argv) > 2:
+        if not build_many_modules(sys.argv[2:]):
+            sys.exit(1)
         return
     
-    # Handle commands that need the MCP server
-    # Locate server script
-    server_script = Path(__file__).parent / "biofinder_server.py"
+    elif command == "reconcile" and len(sys.argv) > 2:
+        if not reconcile_modules(sys.argv[2:]):
+            sys.exit(1)
+        return
     
-    if not server_script.exists():
-        print(f"Error: Server script not found at {server_script}")
-        sys.exit(1)
+    elif command == "cvmfs-list" and len(sys.argv) > 2:
+        list_cvmfs_versions(sys.argv[2])
+        return
+
+    elif command == "scan":
+        if not scan_cache(sys.argv[2:]):
+            sys.exit(1)
+        return
+
+    elif command == "export":
+        if not export_catalog(sys.argv[2:]):
+            sys.exit(1)
+        return
+
+    elif command == "verify":
+        if not await verify_cache(sys.argv[2:]):
+            sys.exit(1)
+        return
+
+    elif command == "compile":
+        if not compile_index(force="--force" in sys.argv[2:]):
+            sys.exit(1)
+        return
     
-    # Server parameters
-    server_params = StdioServerParameters(
-        command="python3",
-        args=[str(server_script)],
-        env=None
-    )
+    # Batch lookup: read the names before connecting
+    tool_names = None
+    if command == "find" and len(sys.argv) > 2 and sys.argv[2] == "-":
+        sources = [arg for arg in sys.argv[3:] if arg != "--versions"]
+        try:
+            tool_names = read_tool_names(sources[0] if sources else None)
+        except OSError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if not tool_names:
+            print("Error: No tool names given")
+            sys.exit(1)
     
-    # Connect to server
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            # Initialize
-            await session.initialize()
-            
-            if command == "find" and len(sys.argv) > 2:
-                await query_tool(session, sys.argv[2])
-            
-            elif command == "search" and len(sys.argv) > 2:
-                description = " ".join(sys.argv[2:])
-                await search_function(session, description)
-            
-            elif command == "versions" and len(sys.argv) > 2:
-                await get_versions(session, sys.argv[2])
-            
-            elif command == "list":
-                limit = 50
-                if len(sys.argv) > 2 and sys.argv[2].isdigit():
-                    limit = int(sys.argv[2])
-                await list_tools(session, limit)
-            
-            elif command == "interactive":
-                await interactive_mode(session)
-            
-            else:
-                print(f"Unknown command: {command}")
-                print("Use --help for usage information")
-                sys.exit(1)
+    # Handle commands that need the MCP server
+    async with connect() as session:
+        if tool_names is not None:
+            await query_tools(session, tool_names, include_versions="--versions" in sys.argv[3:],
+                              output_format=output_format)
+        
+        elif command == "find" and len(sys.argv) > 2:
+            await query_tool(session, sys.argv[2], output_format)
+        
+        elif command == "search" and len(sys.argv) > 2:
+            description = " ".join(sys.argv[2:])
+            await search_function(session, description, output_format=output_format)
+        
+        elif command == "versions" and len(sys.argv) > 2:
+            limit = None
+            if len(sys.argv) > 3 and sys.argv[3].isdigit():
+                limit = int(sys.argv[3])
+            cursor = sys.argv[4] if len(sys.argv) > 4 else None
+            await get_versions(session, sys.argv[2], output_format, limit, cursor)
+        
+        elif command == "complete" and len(sys.argv) > 2:
+            limit = 20
+            if len(sys.argv) > 3 and sys.argv[3].isdigit():
+                limit = int(sys.argv[3])
+            await autocomplete(session, sys.argv[2], limit, output_format)
+        
+        elif command == "list":
+            limit = 50
+            if len(sys.argv) > 2 and sys.argv[2].isdigit():
+                limit = int(sys.argv[2])
+            cursor = sys.argv[3] if len(sys.argv) > 3 else None
+            await list_tools(session, limit, output_format, cursor)
+        
+        elif command == "interactive":
+            await interactive_mode(session)
+        
+        else:
+            print(f"Unknown command: {command}")
+            print("Use --help for usage information")
+            sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -6,19 +6,38 @@ This MCP server provides bioinformatics container discovery for CVMFS-hosted
 Singularity containers, helping users find and use containerized tools.
 """
 
+import argparse
+import base64
 import json
 import gzip
+import hashlib
+import heapq
+import math
+import os
+import pickle
+import signal
+import stat
+import time
+import tracemalloc
 import yaml
 import asyncio
-from datetime import datetime
+import bisect
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+from urllib.parse import parse_qsl, urlsplit
+from array import array
+from collections import Counter, defaultdict
 import re
-from query import STOP_WORDS
+from query import analyse
+from atomic_file import atomic_write
+from container_store import ContainerRef, ContainerStore
+from response_cache import ResponseCache
+from metrics import QueryLog, ToolMetrics, memory_usage
+from cvmfs_verifier import CHANGED, MISSING, TIMEOUT, UNCHECKED, cache_age_seconds, sample_rows, verify_store
 import logging
 import sys
-from difflib import get_close_matches
+from difflib import SequenceMatcher
 
 # MCP SDK imports
 # The MCP server exposes "tools" (callable functions) and "resources" (readable
@@ -29,11 +48,65 @@ from mcp.types import (Resource, Tool, TextContent)
 
 import mcp.server.stdio
 
-# Data paths
-DATA_DIR = Path(__file__).resolve().parent
+# Data paths. BIOFINDER_DATA_DIR points the server at another copy of the data
+# files (and their snapshot), e.g. the synthetic datasets of benchmarks/.
+DATA_DIR = Path(os.environ.get("BIOFINDER_DATA_DIR") or Path(__file__).resolve().parent)
 METADATA_FILE = DATA_DIR / "toolfinder_meta.yaml"
 SINGULARITY_CACHE_FILE = DATA_DIR / "galaxy_singularity_cache.json.gz"
 
+# Compiled index snapshot (see `biofinder compile`). The snapshot is a pickle of
+# the already-parsed and indexed data, so loading it skips YAML/JSON parsing.
+# Bump SNAPSHOT_VERSION whenever the set or layout of snapshot fields changes;
+# snapshots written with another version are ignored and rebuilt.
+SNAPSHOT_FILE = DATA_DIR / "biofinder_index.pkl"
+SNAPSHOT_VERSION = 12
+
+# How long call_tool waits for the background index load before answering with
+# a "still loading" message. Unset (the default) waits until loading finishes.
+LOAD_TIMEOUT = float(os.environ["BIOFINDER_LOAD_TIMEOUT"]) if os.environ.get("BIOFINDER_LOAD_TIMEOUT") else None
+
+# Seconds between checks of the data files for changes; each change triggers a
+# hot reload. 0 disables watching (reloads are still possible via the `reload`
+# tool or SIGHUP).
+WATCH_INTERVAL = float(os.environ.get("BIOFINDER_WATCH_INTERVAL", "30"))
+
+# Daemon mode (biofinder_server.py --socket / --http). The client looks for a
+# daemon on the same socket paths and endpoint, so keep them in sync with
+# biofinder_client.py. The socket never lives in a world-writable directory
+# such as /tmp, where any local user could plant a fake daemon: a site-wide
+# daemon uses the service directory SERVICE_SOCKET (created by root, e.g. by
+# systemd's RuntimeDirectory=biofinder), a personal one $XDG_RUNTIME_DIR.
+SERVICE_SOCKET = "/run/biofinder/biofinder.sock"
+DEFAULT_SOCKET = os.environ.get("BIOFINDER_SOCKET") or (
+    os.path.join(os.environ["XDG_RUNTIME_DIR"], "biofinder.sock")
+    if os.environ.get("XDG_RUNTIME_DIR") else SERVICE_SOCKET
+)
+HTTP_PATH = "/mcp"
+
+# Budget of the rendered call_tool response cache, in millions of characters.
+# 0 disables caching.
+RESPONSE_CACHE_MB = float(os.environ.get("BIOFINDER_RESPONSE_CACHE_MB", "32"))
+
+# Background verification of cached paths against CVMFS: seconds between
+# passes (0, the default, disables it) and how many randomly sampled entries
+# each pass stats (0 stats every entry).
+VERIFY_INTERVAL = float(os.environ.get("BIOFINDER_VERIFY_INTERVAL", "0"))
+VERIFY_SAMPLE = int(os.environ.get("BIOFINDER_VERIFY_SAMPLE", "2000"))
+
+# Seconds between request/latency summaries on stderr (0, the default, disables
+# them; the biofinder://stats resource is always available). Setting
+# BIOFINDER_TRACEMALLOC=1 traces Python allocations from startup so the stats
+# can break memory down by source line, at a cost on every allocation.
+STATS_INTERVAL = float(os.environ.get("BIOFINDER_STATS_INTERVAL", "0"))
+TRACEMALLOC = os.environ.get("BIOFINDER_TRACEMALLOC", "") not in ("", "0")
+
+# JSONL file that every call_tool request is appended to, for replay with
+# benchmarks/replay.py. Unset (the default) disables the log.
+QUERY_LOG = os.environ.get("BIOFINDER_QUERY_LOG")
+
+# libyaml's C loader is an order of magnitude faster than the pure-Python one
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 # Logging
 # We log to stderr only. stdout is reserved exclusively for MCP JSON-RPC
@@ -48,26 +121,170 @@ logging.basicConfig(
 
 log = logging.getLogger("biofinder")
 
+
+# Metadata fields that identify a tool, in lookup priority order
+ALIAS_FIELDS = ('id', 'name', 'biotools', 'biocontainers')
+
+# BM25 parameters for search_by_function, plus how many times an entry's id and
+# name tokens are counted relative to description/EDAM tokens
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_NAME_WEIGHT = 3
+
+# Longest n-gram stored in the partial-match index over metadata ids
+ID_NGRAM_SIZE = 3
+
+
+# Typo tolerance for find_tool/get_container_versions. Names whose difflib
+# similarity ratio to a missed query reaches FUZZY_THRESHOLD are offered as
+# "did you mean" suggestions; if the best one reaches FUZZY_AUTO_RESOLVE it is
+# used in place of the query. Set FUZZY_AUTO_RESOLVE above 1 to never resolve.
+FUZZY_THRESHOLD = float(os.environ.get("BIOFINDER_FUZZY_THRESHOLD", "0.6"))
+FUZZY_AUTO_RESOLVE = float(os.environ.get("BIOFINDER_FUZZY_AUTO_RESOLVE", "0.85"))
+FUZZY_MAX_SUGGESTIONS = 5
+# Trigram candidates re-ranked with difflib per query
+FUZZY_SHORTLIST = 20
+# Trigrams found in more than this fraction of names (" bi", "con", "r-", ...)
+# are "common": their posting lists are never walked, only intersected with
+# the candidates found through the query's rarer trigrams
+FUZZY_COMMON_GRAM_FRACTION = 0.05
+# A one-character edit changes at most this many padded trigrams, so the
+# intended name shares at least one of any FUZZY_EDIT_GRAMS + 1 query trigrams
+FUZZY_EDIT_GRAMS = 3
+# Names sharing fewer than this fraction of the best candidate's trigram count
+# are not shortlisted
+FUZZY_MIN_SHARED = 0.5
+
+
+def _alias_key(name: str) -> str:
+    """Normalise a tool identifier for lookup: case and -/_ insensitive."""
+    return name.strip().lower().replace('_', '-')
+
+
+def _trigrams(name: str) -> set:
+    """Padded character trigrams, so short names and word edges still match."""
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)} if name else set()
+
+
+def source_checksums() -> Dict[str, str]:
+    """SHA-256 of each raw data file, used to detect a stale snapshot."""
+    checksums = {}
+    for path in (METADATA_FILE, SINGULARITY_CACHE_FILE):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        checksums[path.name] = digest.hexdigest()
+    return checksums
+
+
 class BioFinderIndex:
     """Index of container metadata and singularity images."""
+
+    # Attributes persisted in the compiled snapshot. Everything needed to
+    # answer queries must be listed here, otherwise a snapshot-loaded index
+    # would differ from one built from the raw sources.
+    SNAPSHOT_FIELDS = (
+        'metadata',
+        'singularity_entries',
+        'container_index',
+        'cache_info',
+        'alias_index',
+        'meta_ids',
+        'meta_id_positions',
+        'id_ngrams',
+        'fuzzy_names',
+        'fuzzy_gram_counts',
+        'fuzzy_grams',
+        'fuzzy_common',
+        'completion_keys',
+        'completion_names',
+        'catalog',
+        'latest_tools',
+        'latest_rows',
+        'postings',
+        'doc_lengths',
+        'doc_names',
+        'avg_doc_length',
+    )
     
     def __init__(self):
         self.metadata: List[Dict[str, Any]] = []
-        self.singularity_entries: List[Dict[str, Any]] = []
+        self.singularity_entries = ContainerStore("")
         self.tool_to_containers: Dict[str, List[Dict]] = defaultdict(list)
-        self.container_index: Dict[str, List[Dict]] = defaultdict(list)
+        # Tool name -> row numbers in singularity_entries, newest first
+        self.container_index: Dict[str, array] = {}
         self.cache_info: Dict[str, Any] = {}
+        # Bumped on every (re)load; not part of the snapshot
+        self.generation = 0
+        self.loaded_at: Optional[str] = None
+        # Row -> status of entries the background verifier found missing,
+        # changed or unresponsive on CVMFS, and its last report's summary.
+        # Not part of the snapshot either.
+        self.suspects: Dict[int, str] = {}
+        self.verification: Optional[Dict[str, Any]] = None
+        # Seconds spent in each phase of the last load_data()
+        self.load_timings: Dict[str, float] = {}
+        self.alias_index: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[str]]] = {}
+        self.meta_ids: List[str] = []
+        self.meta_id_positions: Dict[str, int] = {}
+        self.id_ngrams: Dict[str, List[int]] = defaultdict(list)
+        self.fuzzy_names: List[str] = []
+        self.fuzzy_gram_counts: List[int] = []
+        self.fuzzy_grams: Dict[str, List[int]] = defaultdict(list)
+        self.fuzzy_common: Dict[str, frozenset] = {}
+        self.completion_keys: List[str] = []
+        self.completion_names: List[str] = []
+        self.catalog: List[str] = []
+        self.latest_tools: List[str] = []
+        self.latest_rows = array('I')
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_lengths: List[int] = []
+        self.doc_names: List[str] = []
+        self.avg_doc_length: float = 0.0
         
-    def load_data(self):
-        """Load metadata and singularity cache."""
+    def load_data(self, use_snapshot: bool = True):
+        """
+        Load the index, preferring the compiled snapshot.
+
+        The snapshot is used only if its version and source checksums match
+        the files on disk. A stale snapshot is rebuilt from the raw sources
+        (best effort, the data directory may be read-only); a missing one is
+        left alone and the raw sources are loaded directly.
+        """
+        start = time.perf_counter()
+        checksums = source_checksums()
+        self.load_timings = {'checksum_s': time.perf_counter() - start}
+        if use_snapshot and SNAPSHOT_FILE.exists():
+            if self.load_snapshot(SNAPSHOT_FILE, checksums):
+                return
+            self.load_sources()
+            try:
+                start = time.perf_counter()
+                self.save_snapshot(SNAPSHOT_FILE, checksums)
+                self.load_timings['snapshot_save_s'] = time.perf_counter() - start
+            except OSError as e:
+                log.warning(f"Could not refresh snapshot {SNAPSHOT_FILE}: {e}")
+            return
+
+        if use_snapshot:
+            log.info("No compiled snapshot found; run `biofinder compile` for faster startup")
+        self.load_sources()
+
+    def load_sources(self):
+        """Load metadata and singularity cache from the raw data files."""
         # Load metadata YAML
         log.info(f"Loading metadata from {METADATA_FILE}...")
+        start = time.perf_counter()
         with open(METADATA_FILE, 'r') as f:
-            self.metadata = yaml.safe_load(f)
+            self.metadata = yaml.load(f, Loader=YAML_LOADER)
+        self.load_timings['yaml_parse_s'] = time.perf_counter() - start
         log.info(f"Loaded {len(self.metadata)} tool metadata entries")
         
         # Load singularity cache
         log.info(f"Loading singularity cache from {SINGULARITY_CACHE_FILE}...")
+        start = time.perf_counter()
         with gzip.open(SINGULARITY_CACHE_FILE, 'rt') as f:
             cache_data = json.load(f)
             self.cache_info = {
@@ -75,30 +292,202 @@ class BioFinderIndex:
                 'cvmfs_root': cache_data['cvmfs_root'],
                 'entry_count': cache_data['entry_count']
             }
-            self.singularity_entries = cache_data['entries']
+            self.singularity_entries = ContainerStore.from_entries(
+                cache_data['entries'], cache_data['cvmfs_root']
+            )
+        self.load_timings['json_parse_s'] = time.perf_counter() - start
         log.info(f"Loaded {len(self.singularity_entries)} singularity entries")
         
         # Build indexes
+        start = time.perf_counter()
         self._build_indexes()
+        self.load_timings['build_indexes_s'] = time.perf_counter() - start
+
+    def load_snapshot(self, path: Path, checksums: Dict[str, str]) -> bool:
+        """
+        Restore the index from a compiled snapshot.
+
+        Returns False (leaving the index untouched) if the snapshot was written
+        by a different SNAPSHOT_VERSION or for different source files.
+        """
+        start = time.perf_counter()
+        try:
+            with open(path, 'rb') as f:
+                # The header is pickled separately so a stale snapshot can be
+                # rejected without unpickling the whole index.
+                header = pickle.load(f)
+                if header.get('version') != SNAPSHOT_VERSION:
+                    log.info(f"Snapshot {path} has version {header.get('version')}, expected {SNAPSHOT_VERSION}")
+                    return False
+                if header.get('checksums') != checksums:
+                    log.info(f"Snapshot {path} is stale (source files changed)")
+                    return False
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            log.warning(f"Could not read snapshot {path}: {e}")
+            return False
+
+        for field in self.SNAPSHOT_FIELDS:
+            setattr(self, field, state[field])
+        self.load_timings['snapshot_load_s'] = time.perf_counter() - start
+        elapsed = (time.perf_counter() - start) * 1000
+        log.info(f"Loaded compiled snapshot {path} in {elapsed:.0f} ms")
+        return True
+
+    def save_snapshot(self, path: Path, checksums: Dict[str, str]):
+        """Write the current index to a compiled snapshot, atomically."""
+        header = {
+            'version': SNAPSHOT_VERSION,
+            'checksums': checksums,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+        }
+        state = {field: getattr(self, field) for field in self.SNAPSHOT_FIELDS}
+
+        # A concurrently starting server never sees a partial file
+        with atomic_write(path, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        log.info(f"Wrote compiled snapshot {path}")
         
     def _build_indexes(self):
         """Build search indexes."""
-        # Index containers by tool name
-        for entry in self.singularity_entries:
-            tool_name = entry['tool_name'].lower()
-            self.container_index[tool_name].append(entry)
+        # Index container rows by tool name
+        store = self.singularity_entries
+        rows_by_tool: Dict[str, List[int]] = defaultdict(list)
+        for row, tool_id in enumerate(store.tool_ids):
+            rows_by_tool[store.tool_names[tool_id].lower()].append(row)
+
+        # Store each tool's rows newest first, so lookups never sort and the
+        # latest version is always element 0
+        self.container_index = {}
+        for tool_name, rows in rows_by_tool.items():
+            rows.sort(key=lambda row: self._parse_version(store.tag(row) or ''), reverse=True)
+            self.container_index[tool_name] = array('I', rows)
+
+        self._build_alias_index()
+        self._build_fuzzy_index()
+        self._build_search_index()
+        self._build_completion_index()
+        self._build_latest_table()
+
+    def _build_latest_table(self):
+        """Every container tool name, sorted, with the row of its newest container."""
+        self.latest_tools = sorted(self.container_index)
+        self.latest_rows = array('I', (self.container_index[name][0] for name in self.latest_tools))
+
+    def _build_completion_index(self):
+        """
+        Sorted lowercase keys (with display names) of every tool, for
+        autocomplete(), and the sorted tool catalog, for list_all_tools().
+        """
+        names = {}
+        for entry in self.metadata:
+            if entry.get('id'):
+                names.setdefault(entry['id'].lower(), entry['id'])
+        for tool_name in self.container_index:
+            names.setdefault(tool_name, tool_name)
+        self.completion_keys = sorted(names)
+        self.completion_names = [names[key] for key in self.completion_keys]
+
+        # Metadata ids keep their case, so "Bowtie2" and the container
+        # "bowtie2" are both listed
+        catalog = {entry['id'] for entry in self.metadata if entry.get('id')}
+        catalog.update(self.container_index)
+        self.catalog = sorted(catalog)
+
+    def _build_fuzzy_index(self):
+        """Character-trigram index over every alias, for suggest()."""
+        self.fuzzy_names = sorted(self.alias_index)
+        self.fuzzy_gram_counts = []
+        self.fuzzy_grams = defaultdict(list)
+        for name_id, name in enumerate(self.fuzzy_names):
+            grams = _trigrams(name)
+            self.fuzzy_gram_counts.append(len(grams))
+            for gram in grams:
+                self.fuzzy_grams[gram].append(name_id)
+        common = FUZZY_COMMON_GRAM_FRACTION * len(self.fuzzy_names)
+        self.fuzzy_common = {
+            gram: frozenset(posting) for gram, posting in self.fuzzy_grams.items() if len(posting) > common
+        }
+
+    def _build_alias_index(self):
+        """
+        Map every identifier a user might type to (metadata entry, container key).
+
+        Exact lowercase identifiers are registered before their -/_ normalised
+        forms, and earlier metadata entries win. The container key is the
+        identifier itself or its -/_ variant when either names a container;
+        only otherwise is it taken from the matched entry's id or
+        biocontainers name (so "rtg_core" finds the rtg-core container, not
+        rtg-tools' images).
+        """
+        meta_aliases: Dict[str, Dict[str, Any]] = {}
+        for normalise in (str.lower, _alias_key):
+            for entry in self.metadata:
+                for field in ALIAS_FIELDS:
+                    value = entry.get(field)
+                    if value:
+                        meta_aliases.setdefault(normalise(str(value)), entry)
+
+        container_aliases: Dict[str, str] = {}
+        for normalise in (str.lower, _alias_key):
+            for key in sorted(self.container_index):
+                container_aliases.setdefault(normalise(key), key)
+
+        # Container key for each metadata entry, via its id then biocontainers name
+        entry_containers: Dict[int, str] = {}
+        for entry in self.metadata:
+            for field in ('id', 'biocontainers'):
+                value = entry.get(field)
+                if not value:
+                    continue
+                key = container_aliases.get(value.lower()) or container_aliases.get(_alias_key(value))
+                if key:
+                    entry_containers[id(entry)] = key
+                    break
+
+        self.alias_index = {}
+        for key in meta_aliases.keys() | container_aliases.keys():
+            entry = meta_aliases.get(key)
+            container_key = container_aliases.get(key) or container_aliases.get(_alias_key(key))
+            if container_key is None and entry is not None:
+                container_key = entry_containers.get(id(entry))
+            self.alias_index[key] = (entry, container_key)
+
+        # Partial-match structures over metadata ids: every 1..N-gram of each
+        # id maps to the positions of the entries containing it.
+        self.meta_ids = [str(entry.get('id') or '').lower() for entry in self.metadata]
+        self.meta_id_positions = {}
+        self.id_ngrams = defaultdict(list)
+        for pos, entry_id in enumerate(self.meta_ids):
+            self.meta_id_positions.setdefault(entry_id, pos)
+            grams = {
+                entry_id[i:i + n]
+                for n in range(1, ID_NGRAM_SIZE + 1)
+                for i in range(len(entry_id) - n + 1)
+            }
+            for gram in grams:
+                self.id_ngrams[gram].append(pos)
             
-    def _parse_version(self, tag: str) -> Tuple[List[int], str]:
-        """Parse version from tag for sorting."""
+    def _parse_version(self, tag: str) -> Tuple[List[int], int, str]:
+        """
+        Parse version from tag for sorting.
+
+        Sorts by the numeric version, then by the build number at the end of
+        the build string, then by the full tag, so builds of the same version
+        ("1.22--h96c455f_0" vs "1.22--h96c455f_1") always order the same way.
+        """
         # Extract version number (e.g., "0.12.1" from "0.12.1--hdfd78af_1")
         match = re.match(r'^(\d+(?:\.\d+)*)', tag)
-        if match:
-            version_str = match.group(1)
-            version_parts = [int(x) for x in version_str.split('.')]
-            return (version_parts, tag)
-        return ([0], tag)
+        version_parts = [int(x) for x in match.group(1).split('.')] if match else [0]
+
+        # Build number (e.g., 1 from "0.12.1--hdfd78af_1" or "0.11.9--1")
+        build = re.search(r'(?:--|_)(\d+)$', tag)
+        build_number = int(build.group(1)) if build else -1
+
+        return (version_parts, build_number, tag)
         
-    def search_tool(self, query: str) -> Dict[str, Any]:
+    def search_tool(self, query: str, offset: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
         """
         Search for a tool and return metadata + available containers.
         
@@ -107,70 +496,160 @@ class BioFinderIndex:
         - Available containers with versions
         - Most recent version
         - Usage examples
+
+        `offset` and `limit` select a page of the containers (newest first);
+        `container_count` is always the total.
         """
         query_lower = query.lower()
-        
-        # Find in metadata
-        tool_meta = None
-        for entry in self.metadata:
-            entry_id = entry.get('id', '') or ''
-            entry_name = entry.get('name', '') or ''
-            entry_biotools = entry.get('biotools', '') or ''
-            entry_biocontainers = entry.get('biocontainers', '') or ''
-            
-            if (entry_id.lower() == query_lower or 
-                entry_name.lower() == query_lower or
-                entry_biotools.lower() == query_lower or
-                entry_biocontainers.lower() == query_lower):
-                tool_meta = entry
+
+        # Exact match on any identifier (case and -/_ insensitive)
+        tool_meta, container_key = None, None
+        for key in (query_lower, _alias_key(query)):
+            if key in self.alias_index:
+                tool_meta, container_key = self.alias_index[key]
                 break
-        
+        exact = tool_meta is not None or container_key is not None
+
         # Search for partial matches if exact match not found
         if not tool_meta:
-            for entry in self.metadata:
-                entry_id = entry.get('id', '').lower()
-                if query_lower in entry_id or entry_id in query_lower:
-                    tool_meta = entry
-                    break
-        
-        # Get containers - try exact match first, then variations
-        containers = []
-        search_variations = [
-            query_lower,
-            query_lower.replace('-', '_'),
-            query_lower.replace('_', '-'),
-        ]
-        
-        # Add name if available
-        if tool_meta and tool_meta.get('id'):
-            search_variations.append(tool_meta['id'].lower())
-        
-        for variation in search_variations:
-            if variation in self.container_index:
-                containers = self.container_index[variation]
-                break
-        
-        # Sort containers by version (newest first)
-        if containers:
-            containers_sorted = sorted(
-                containers,
-                key=lambda x: self._parse_version(x['tag']),
-                reverse=True
-            )
-        else:
-            containers_sorted = []
+            tool_meta = self._partial_match(query_lower)
+            if tool_meta and not container_key:
+                container_key = self.alias_index[tool_meta['id'].lower()][1]
+
+        # Probably a typo: suggest close names, and switch to the best one
+        # if it is similar enough to beat the partial match
+        suggestions = []
+        resolved_name = None
+        if not exact:
+            suggestions = self.suggest(query)
+            if suggestions and suggestions[0][1] >= FUZZY_AUTO_RESOLVE:
+                resolved_name = suggestions[0][0]
+                tool_meta, container_key = self.alias_index[resolved_name]
+
+        # Already sorted newest first by _build_indexes
+        rows = self.container_index[container_key] if container_key else ()
+        end = len(rows) if limit is None else offset + limit
+        containers = [self.singularity_entries[row] for row in rows[offset:end]]
         
         return {
             'query': query,
             'metadata': tool_meta,
-            'containers': containers_sorted,
-            'container_count': len(containers_sorted)
+            'containers': containers,
+            'container_count': len(rows),
+            'resolved_name': resolved_name,
+            'suggestions': [name for name, _ in suggestions if name != resolved_name],
         }
 
-    def _normalise(self, text: str) -> List[str]:
-        text = text.lower()
-        text = re.sub(r"[^\w\s\-]", " ", text)
-        return text.split()
+    def suggest(self, query: str, limit: int = FUZZY_MAX_SUGGESTIONS) -> List[Tuple[str, float]]:
+        """
+        "Did you mean" candidates for a misspelled tool name.
+
+        Names sharing the most character trigrams with the query are
+        shortlisted from the trigram index, then re-ranked by difflib's
+        similarity ratio. Returns (name, ratio) pairs, best first, keeping
+        only those at or above FUZZY_THRESHOLD and one name per tool.
+
+        Candidates come from the query's rarer trigrams; the common ones
+        (fuzzy_common) only add to the counts of those candidates, so the
+        cost follows the rare trigrams rather than the size of the index.
+        """
+        key = _alias_key(query)
+        grams = _trigrams(key)
+        if not grams:
+            return []
+
+        # Count shared trigrams per name, rarest trigram first; the Counter
+        # updates run in C. Common trigrams are deferred once enough rarer
+        # ones have been counted to reach any name one edit away.
+        shared = Counter()
+        deferred = []
+        for counted, gram in enumerate(sorted(grams, key=lambda gram: len(self.fuzzy_grams.get(gram, ())))):
+            if counted > FUZZY_EDIT_GRAMS and gram in self.fuzzy_common:
+                deferred.append(self.fuzzy_common[gram])
+            else:
+                shared.update(self.fuzzy_grams.get(gram, ()))
+        if not shared:
+            return []
+        if deferred:
+            # A name one edit away misses at most FUZZY_EDIT_GRAMS of the
+            # trigrams counted so far
+            floor = max(shared.values()) - FUZZY_EDIT_GRAMS
+            shared = Counter({name_id: count for name_id, count in shared.items() if count >= floor})
+            for common in deferred:
+                shared.update(common.intersection(shared))
+        min_shared = FUZZY_MIN_SHARED * max(shared.values())
+
+        # Dice coefficient on trigram sets picks the shortlist. Ties go to the
+        # alphabetically first name: Counter order follows set iteration order,
+        # which changes between processes
+        shortlist = heapq.nlargest(
+            FUZZY_SHORTLIST,
+            [item for item in shared.items() if item[1] >= min_shared],
+            key=lambda item: (2 * item[1] / (len(grams) + self.fuzzy_gram_counts[item[0]]), -item[0]),
+        )
+
+        matcher = SequenceMatcher(b=key, autojunk=False)
+        scored = []
+        for name_id, _ in shortlist:
+            name = self.fuzzy_names[name_id]
+            matcher.set_seq1(name)
+            # Cheap upper bound first: long unrelated names (mulled-v2-...)
+            # are slow to match in full
+            if matcher.real_quick_ratio() < FUZZY_THRESHOLD:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= FUZZY_THRESHOLD:
+                scored.append((name, ratio))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+
+        # Several names (e.g. "bwa-mem2", "bwa_mem2") can resolve to one tool
+        results, seen = [], set()
+        for name, ratio in scored:
+            meta, container_key = self.alias_index[name]
+            target = (id(meta), container_key)
+            if target in seen:
+                continue
+            seen.add(target)
+            results.append((name, ratio))
+            if len(results) >= limit:
+                break
+        return results
+
+    def _partial_match(self, query_lower: str) -> Optional[Dict[str, Any]]:
+        """
+        First metadata entry whose id contains the query, or is contained in it.
+
+        Candidates for "id contains query" come from the id n-gram index and are
+        verified with a substring test; "query contains id" is answered by
+        looking up every substring of the query in the id table.
+        """
+        if not query_lower:
+            return None
+
+        if len(query_lower) <= ID_NGRAM_SIZE:
+            candidates = set(self.id_ngrams.get(query_lower, ()))
+        else:
+            postings = sorted(
+                (self.id_ngrams.get(query_lower[i:i + ID_NGRAM_SIZE], ())
+                 for i in range(len(query_lower) - ID_NGRAM_SIZE + 1)),
+                key=len,
+            )
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(posting)
+            candidates = {pos for pos in candidates if query_lower in self.meta_ids[pos]}
+
+        for start in range(len(query_lower)):
+            for end in range(start + 1, len(query_lower) + 1):
+                pos = self.meta_id_positions.get(query_lower[start:end])
+                if pos is not None:
+                    candidates.add(pos)
+
+        if not candidates:
+            return None
+        return self.metadata[min(candidates)]
 
     def _flatten_edam(self, value):
         """Flatten EDAM fields safely."""
@@ -195,72 +674,360 @@ class BioFinderIndex:
 
         return results
 
-    def _search_metadata(self, query: str) -> List[str]:
+    def _entry_tokens(self, entry: Dict[str, Any]) -> List[str]:
+        """Analysed terms of a metadata entry, with id/name terms up-weighted."""
+        entry_id = str(entry.get("id") or "")
+        entry_name = str(entry.get("name") or "")
+        entry_description = str(entry.get("description") or "")
+
+        text_parts = [entry_description]
+        for field in (
+            "edam-operations",
+            "edam-topics",
+            "edam-inputs",
+            "edam-outputs",
+        ):
+            text_parts.extend(self._flatten_edam(entry.get(field)))
+
+        # Repeating the identifier tokens raises their term frequency, so a
+        # query naming the tool outranks one that only appears in descriptions
+        name_tokens = analyse(f"{entry_id} {entry_name}")
+        return name_tokens * BM25_NAME_WEIGHT + analyse(" ".join(text_parts))
+
+    def _build_search_index(self):
         """
-        Search metadata and return matching tool names.
-        OR-based matching with token-level accuracy.
+        Build the inverted index (term -> [(entry position, tf)]) for BM25.
+
+        Each entry goes through the query.analyse() pipeline exactly once here;
+        its analysed terms live on in the posting lists.
         """
+        self.postings = defaultdict(list)
+        self.doc_lengths = []
+        self.doc_names = []
 
-        query_tokens = set(self._normalise(query))
-        results = []
+        for pos, entry in enumerate(self.metadata):
+            tokens = self._entry_tokens(entry)
+            self.doc_lengths.append(len(tokens))
+            self.doc_names.append(str(entry.get("name") or entry.get("id") or ""))
 
-        for entry in self.metadata:
-            entry_id = str(entry.get("id") or "")
-            entry_name = str(entry.get("name") or "")
-            entry_description = str(entry.get("description") or "")
+            term_freqs: Dict[str, int] = defaultdict(int)
+            for token in tokens:
+                term_freqs[token] += 1
+            for token, tf in term_freqs.items():
+                self.postings[token].append((pos, tf))
 
-            text_parts = [entry_id, entry_name, entry_description]
+        self.avg_doc_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0.0
 
-            for field in (
-                "edam-operations",
-                "edam-topics",
-                "edam-inputs",
-                "edam-outputs",
-            ):
-                text_parts.extend(self._flatten_edam(entry.get(field)))
+    def _search_metadata(self, query: str, limit: int = 10) -> List[str]:
+        """
+        Search metadata and return the top `limit` tool names, best first.
 
-            searchable_tokens = set(self._normalise(" ".join(text_parts)))
+        Entries are scored with BM25 over the inverted index, so only the
+        posting lists of the query's own tokens are visited.
+        """
+        num_docs = len(self.doc_lengths)
+        scores: Dict[int, float] = defaultdict(float)
 
-            if not searchable_tokens:
+        for token in set(analyse(query)):
+            posting = self.postings.get(token)
+            if not posting:
                 continue
+            idf = math.log(1 + (num_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for pos, tf in posting:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[pos] / self.avg_doc_length)
+                scores[pos] += idf * tf * (BM25_K1 + 1) / (tf + norm)
 
-            # Token intersection instead of substring matching
-            overlap = query_tokens.intersection(searchable_tokens)
+        # Several entries can share a display name; keep the best score
+        best: Dict[str, float] = {}
+        for pos, score in scores.items():
+            tool_name = self.doc_names[pos]
+            if tool_name and score > best.get(tool_name, 0.0):
+                best[tool_name] = score
 
-            if overlap:
-                tool_name = entry_name or entry_id
-                if tool_name:
-                    results.append(tool_name)
-
-        return sorted(set(results))
+        # Highest score first, alphabetical among ties
+        top = heapq.nsmallest(limit, best.items(), key=lambda item: (-item[1], item[0]))
+        return [tool_name for tool_name, _ in top]
  
-    def search_by_description(self, query: str) -> List[str]:
+    def search_by_description(self, query: str, limit: int = 10) -> List[str]:
         """
         Search tools by description or functionality.
         Useful for queries like "What can I use to generate count data?"
         """
-        log.info(query)
-        return self._search_metadata(query)
+        log.debug(query)
+        return self._search_metadata(query, limit)
     
-    def list_all_tools(self, limit: int = 10) -> List[str]:
-        """List all available tool names."""
-        tools = set()
-        
-        # From metadata
-        for entry in self.metadata:
-            if entry.get('id'):
-                tools.add(entry['id'])
-        
-        # From containers
-        for tool_name in self.container_index.keys():
-            tools.add(tool_name)
-        
-        return sorted(list(tools))[:limit]
+    def autocomplete(self, prefix: str, limit: int = 20) -> Tuple[List[str], int]:
+        """
+        Tool names starting with `prefix` (case-insensitive), alphabetically.
+
+        Binary search over the pre-sorted completion keys, so the cost is
+        O(log N + limit). Returns (first `limit` names, total match count).
+        """
+        prefix = prefix.lower()
+        lo = bisect.bisect_left(self.completion_keys, prefix)
+        hi = bisect.bisect_left(self.completion_keys, prefix + "\U0010ffff", lo)
+        return self.completion_names[lo:min(hi, lo + limit)], hi - lo
+
+    def list_all_tools(self, limit: int = 10, offset: int = 0) -> List[str]:
+        """List available tool names alphabetically, from `offset` on."""
+        return self.catalog[offset:offset + limit]
+
+    def iter_latest(self) -> Iterator[Tuple[str, ContainerRef, int]]:
+        """(tool name, newest container, number of versions) for every container tool, by name."""
+        for tool_name, row in zip(self.latest_tools, self.latest_rows):
+            yield tool_name, self.singularity_entries[row], len(self.container_index[tool_name])
+
+
+def compile_snapshot(force: bool = False) -> bool:
+    """
+    Build the compiled snapshot from the raw data files.
+
+    Skips the rebuild if an up-to-date snapshot already exists, unless `force`.
+    Returns True if a new snapshot was written.
+    """
+    checksums = source_checksums()
+    if not force and SNAPSHOT_FILE.exists():
+        try:
+            with open(SNAPSHOT_FILE, 'rb') as f:
+                header = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            header = {}
+        if header.get('version') == SNAPSHOT_VERSION and header.get('checksums') == checksums:
+            log.info(f"Snapshot {SNAPSHOT_FILE} is up to date")
+            return False
+
+    compiled = BioFinderIndex()
+    compiled.load_sources()
+    compiled.save_snapshot(SNAPSHOT_FILE, checksums)
+    return True
+
+
+EXPORT_FORMATS = ("tsv", "json")
+LATEST_COLUMNS = ("tool", "tag", "path", "size_bytes", "mtime", "versions")
+
+
+def export_index(idx: BioFinderIndex, out: TextIO, latest: bool = False, fmt: str = "tsv") -> int:
+    """
+    Stream the tool catalog, or with `latest` the newest container of every
+    tool, to `out` in one pass over the prebuilt tables.
+
+    TSV has a header row; JSON is one array, written row by row. Returns the
+    number of rows written.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})")
+
+    if latest:
+        rows = (
+            (tool_name, container['tag'], container['path'],
+             container['size_bytes'], container['mtime'], versions)
+            for tool_name, container, versions in idx.iter_latest()
+        )
+        columns = LATEST_COLUMNS
+    else:
+        rows = ((tool_name,) for tool_name in idx.catalog)
+        columns = ("tool",)
+
+    count = 0
+    if fmt == "tsv":
+        out.write("\t".join(columns) + "\n")
+        for row in rows:
+            out.write("\t".join("" if value is None else str(value) for value in row) + "\n")
+            count += 1
+    else:
+        out.write("[")
+        for row in rows:
+            item = dict(zip(columns, row)) if latest else row[0]
+            out.write(("," if count else "") + "\n" + json.dumps(item, ensure_ascii=False))
+            count += 1
+        out.write("\n]\n")
+    return count
 
 
 # Initialize the index
 index = BioFinderIndex()
 
+# The index is loaded in the background by main(), so the MCP handshake and
+# list_tools/list_resources never wait on it. Handlers that need the data call
+# _wait_for_index() first. The event is created inside the running loop.
+index_ready: Optional[asyncio.Event] = None
+index_load_error: Optional[BaseException] = None
+
+STILL_LOADING_MESSAGE = "BioFinder is still loading its index. Please retry in a few seconds."
+
+
+async def _load_index():
+    """Load the index off the event loop and signal readiness."""
+    global index_load_error
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(None, index.load_data)
+        index.generation = 1
+        index.loaded_at = datetime.now(timezone.utc).isoformat()
+    except Exception as e:
+        log.exception("Failed to load index")
+        index_load_error = e
+    finally:
+        index_ready.set()
+
+
+async def _wait_for_index() -> bool:
+    """
+    Wait until the index is loaded.
+
+    Returns False if LOAD_TIMEOUT elapsed first. Raises if loading failed.
+    """
+    try:
+        await asyncio.wait_for(index_ready.wait(), LOAD_TIMEOUT)
+    except asyncio.TimeoutError:
+        return False
+    if index_load_error is not None:
+        raise RuntimeError(f"BioFinder index failed to load: {index_load_error}")
+    return True
+
+
+# Serialises reloads; created inside the running loop by main()
+reload_lock: Optional[asyncio.Lock] = None
+
+
+async def reload_index(reason: str) -> BioFinderIndex:
+    """
+    Build a fresh index off the event loop and swap it in.
+
+    Handlers take a reference to the current index when they start, so
+    requests already in flight finish on the old generation while new ones
+    see the new one. If the rebuild fails the old index stays in place.
+    """
+    global index, index_load_error
+    await index_ready.wait()
+    async with reload_lock:
+        log.info(f"Reloading index ({reason})...")
+        fresh = BioFinderIndex()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, fresh.load_data)
+        fresh.generation = index.generation + 1
+        fresh.loaded_at = datetime.now(timezone.utc).isoformat()
+        index = fresh
+        # A successful reload recovers from a failed initial load
+        index_load_error = None
+        # Entries are keyed by generation, so none can be hit again
+        stats = response_cache.stats()
+        log.info(f"Response cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions")
+        response_cache.clear()
+        log.info(f"Index generation {fresh.generation} is live")
+        return fresh
+
+
+async def _reload_quietly(reason: str):
+    """reload_index() for background triggers, which have no caller to report to."""
+    try:
+        await reload_index(reason)
+    except Exception:
+        log.exception("Index reload failed; still serving the previous generation")
+
+
+def data_signature() -> Dict[str, Tuple[int, int, int]]:
+    """(mtime, size, inode) of each data file; changes when a file is replaced."""
+    signature = {}
+    for path in (METADATA_FILE, SINGULARITY_CACHE_FILE):
+        try:
+            st = path.stat()
+            signature[path.name] = (st.st_mtime_ns, st.st_size, st.st_ino)
+        except OSError:
+            signature[path.name] = (0, 0, 0)
+    return signature
+
+
+async def watch_data_files(interval: float):
+    """Reload the index whenever either data file changes on disk."""
+    last = data_signature()
+    while True:
+        await asyncio.sleep(interval)
+        current = data_signature()
+        if current != last:
+            last = current
+            # Let a copy that is still in progress finish before reading it
+            await asyncio.sleep(interval)
+            if data_signature() != current:
+                continue
+            await _reload_quietly("data files changed")
+
+
+async def verify_containers(interval: float, sample: int):
+    """
+    Periodically stat cached container paths and record suspect entries.
+
+    Each pass checks `sample` random rows (all rows if 0) of the current
+    index. A row found OK again is cleared; rows left unchecked keep their
+    previous status. Rendered responses are dropped whenever the set of
+    suspects changes, since find_tool output marks them.
+    """
+    await index_ready.wait()
+    while True:
+        idx = index
+        store = idx.singularity_entries
+        rows = sample_rows(len(store), sample or None)
+        try:
+            report = await verify_store(store, rows)
+        except Exception:
+            log.exception("Container verification failed")
+            await asyncio.sleep(interval)
+            continue
+
+        if report['root_available']:
+            before = dict(idx.suspects)
+            # Rows left unchecked (every lane hung) keep their previous status
+            for row in rows:
+                if report['suspects'].get(row) != UNCHECKED:
+                    idx.suspects.pop(row, None)
+            for row, status in report['suspects'].items():
+                if status in (MISSING, CHANGED, TIMEOUT):
+                    idx.suspects[row] = status
+            if idx.suspects != before and idx is index:
+                response_cache.clear()
+
+        counts = report['counts']
+        idx.verification = {
+            'verified_at': report['verified_at'],
+            'checked': report['checked'],
+            'root_available': report['root_available'],
+            'counts': counts,
+            'suspect_count': len(idx.suspects),
+        }
+        log.info(
+            f"Verified {report['checked']} cached paths in {report['elapsed_seconds']:.1f} s: "
+            f"{counts[MISSING]} missing, {counts[CHANGED]} changed, {counts[TIMEOUT]} timed out"
+        )
+        await asyncio.sleep(interval)
+
+
+def server_stats(idx: BioFinderIndex) -> Dict[str, Any]:
+    """Everything biofinder://stats reports, for one index generation."""
+    return {
+        **tool_metrics.stats(),
+        'index': {
+            'generation': idx.generation,
+            'loaded_at': idx.loaded_at,
+            'load_timings': idx.load_timings,
+            'metadata_entries': len(idx.metadata),
+            'container_entries': len(idx.singularity_entries),
+        },
+        'response_cache': response_cache.stats(),
+        'memory': memory_usage(),
+    }
+
+
+async def log_stats(interval: float):
+    """Write a request and memory summary to stderr every `interval` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        memory = memory_usage(top=0)
+        cache = response_cache.stats()
+        log.info(
+            f"Stats: {tool_metrics.summary()} | response cache hit rate {cache['hit_rate']:.0%} "
+            f"| RSS {memory['rss_mb'] or 0:.0f} MB (peak {memory['peak_rss_mb'] or 0:.0f} MB)"
+        )
+
 # Create MCP server
 app = Server("bio-finder")
 
@@ -275,11 +1042,24 @@ async def list_resources() -> list[Resource]:
             mimeType="application/json",
             description="Information about the Singularity container cache from the CVMFS"
         ),
+        Resource(
+            uri="biofinder://stats",
+            name="Server statistics",
+            mimeType="application/json",
+            description=(
+                "Per-tool request counts and latency histograms, index load phase "
+                "timings, response cache counters and memory usage"
+            )
+        ),
         Resource(
             uri="biofinder://metadata",
             name="Tool metadata",
             mimeType="text/plain",
-            description="Bio.tools metadata from https://github.com/AustralianBioCommons/finder-service-metadata/blob/main/data/data.yaml"
+            description=(
+                "Bio.tools metadata from https://github.com/AustralianBioCommons/finder-service-metadata/blob/main/data/data.yaml. "
+                "All tool names, one per line; read biofinder://metadata?limit=N[&cursor=C] "
+                "for a JSON page {tools, next_cursor}"
+            )
         )
     ]
 
@@ -287,15 +1067,52 @@ async def list_resources() -> list[Resource]:
 @app.read_resource()
 async def read_resource(uri: str) -> str:
     """Read resource content."""
+    if not await _wait_for_index():
+        raise RuntimeError(STILL_LOADING_MESSAGE)
+
+    # The SDK passes a pydantic AnyUrl, which never compares equal to a str
+    uri = str(uri)
+    idx = index
     if uri == "biofinder://cvmfs-galaxy-containers":
-        return json.dumps(index.cache_info, indent=2)
+        return json.dumps({
+            **idx.cache_info,
+            'cache_age_seconds': cache_age_seconds(idx.cache_info.get('generated_at')),
+            'generation': idx.generation,
+            'loaded_at': idx.loaded_at,
+            'verification': idx.verification,
+        }, indent=2)
+    elif uri == "biofinder://stats":
+        return json.dumps(server_stats(idx), indent=2)
     elif uri == "biofinder://metadata":
-        tools = index.list_all_tools(limit=999999)
-        return "\n".join(tools)
+        return "\n".join(idx.catalog)
+    elif uri.startswith("biofinder://metadata?"):
+        # Paged read: biofinder://metadata?limit=N[&cursor=C]
+        params = dict(parse_qsl(urlsplit(uri).query))
+        if "limit" in params:
+            params["limit"] = int(params["limit"])
+        tools, _, next_cursor = _catalog_page(idx, params, default_limit=1000)
+        return _compact_json({'tools': tools, 'next_cursor': next_cursor})
     else:
         raise ValueError(f"Unknown resource: {uri}")
 
 
+# Optional argument accepted by every tool: "json" returns compact structured
+# results (see render_tool_json) instead of the formatted text
+FORMAT_PROPERTY = {
+    "type": "string",
+    "enum": ["text", "json"],
+    "description": "Response format: formatted text (default) or compact JSON for scripts and agents",
+    "default": "text"
+}
+
+
+# Optional argument of the paginated tools: resume after a previous page
+CURSOR_PROPERTY = {
+    "type": "string",
+    "description": "Cursor returned with the previous page; omit for the first page"
+}
+
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available MCP tools."""
@@ -313,11 +1130,37 @@ async def list_tools() -> list[Tool]:
                     "tool_name": {
                         "type": "string",
                         "description": "Name of the tool to search for (e.g., 'fastqc', 'iqtree', 'samtools')"
-                    }
+                    },
+                    "format": FORMAT_PROPERTY
                 },
                 "required": ["tool_name"]
             }
         ),
+        Tool(
+            name="find_tools",
+            description=(
+                "Look up many bioinformatics tools by name in one call, e.g. every tool of a workflow. "
+                "Returns, per name, the most recent container and its CVMFS path, the number of "
+                "versions, and suggestions for names that were not found."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "tool_names": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Names of the tools to look up"
+                    },
+                    "include_versions": {
+                        "type": "boolean",
+                        "description": "Also list every container version of each tool",
+                        "default": False
+                    },
+                    "format": FORMAT_PROPERTY
+                },
+                "required": ["tool_names"]
+            }
+        ),
         Tool(
             name="search_by_function",
             description=(
@@ -336,7 +1179,8 @@ async def list_tools() -> list[Tool]:
                         "type": "integer",
                         "description": "Maximum number of results to return",
                         "default": 10
-                    }
+                    },
+                    "format": FORMAT_PROPERTY
                 },
                 "required": ["description"]
             }
@@ -345,7 +1189,8 @@ async def list_tools() -> list[Tool]:
             name="get_container_versions",
             description=(
                 "Get all available versions of a specific container. "
-                "Returns a sorted list of versions with their CVMFS paths."
+                "Returns a sorted list of versions with their CVMFS paths, newest first. "
+                "Pass `limit` to page through long histories with the returned cursor."
             ),
             inputSchema={
                 "type": "object",
@@ -353,7 +1198,13 @@ async def list_tools() -> list[Tool]:
                     "tool_name": {
                         "type": "string",
                         "description": "Name of the tool"
-                    }
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of versions to return (default: all)"
+                    },
+                    "cursor": CURSOR_PROPERTY,
+                    "format": FORMAT_PROPERTY
                 },
                 "required": ["tool_name"]
             }
@@ -370,29 +1221,154 @@ async def list_tools() -> list[Tool]:
                     "limit": {
                         "type": "integer",
                         "description": "Maximum number of tools to list",
-                        "default": 10
-                    }
+                        "default": 50
+                    },
+                    "cursor": CURSOR_PROPERTY,
+                    "format": FORMAT_PROPERTY
                 },
                 "required": []
             }
+        ),
+        Tool(
+            name="autocomplete",
+            description=(
+                "Complete a partial tool name. "
+                "Returns tool names starting with the given prefix, alphabetically. "
+                "Use this to browse tool families such as 'bioconductor-' or 'r-'."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "prefix": {
+                        "type": "string",
+                        "description": "Start of the tool name (case-insensitive)"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of names to return",
+                        "default": 20
+                    },
+                    "format": FORMAT_PROPERTY
+                },
+                "required": ["prefix"]
+            }
+        ),
+        Tool(
+            name="reload",
+            description=(
+                "Reload the tool metadata and container cache from disk. "
+                "Use this after the data files have been updated."
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {"format": FORMAT_PROPERTY},
+                "required": []
+            }
         )
     ]
 
 
+# Rendered responses of call_tool, per (tool, arguments, index generation)
+response_cache = ResponseCache(int(RESPONSE_CACHE_MB * 1_000_000))
+
+# Request counts and latencies of call_tool, per tool (biofinder://stats)
+tool_metrics = ToolMetrics()
+
+# Opened by main() when BIOFINDER_QUERY_LOG is set
+query_log: Optional[QueryLog] = None
+
+
 @app.call_tool()
 async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     """
     Handle tool calls based on the tool name and arguments. 
 
+    Time spent waiting for the initial index load is not counted in
+    tool_metrics or the query log; everything after it is, cache hits
+    included.
+    """
+    if not await _wait_for_index():
+        return [TextContent(type="text", text=STILL_LOADING_MESSAGE)]
+
+    start = time.perf_counter()
+    try:
+        response = await answer_tool_call(name, arguments)
+    except Exception as e:
+        elapsed = time.perf_counter() - start
+        tool_metrics.record(name, elapsed, failed=True)
+        if query_log is not None:
+            query_log.write(name, arguments, elapsed, error=str(e))
+        raise
+    elapsed = time.perf_counter() - start
+    tool_metrics.record(name, elapsed)
+    if query_log is not None:
+        query_log.write(name, arguments, elapsed, sum(len(content.text) for content in response))
+    return response
+
+
+async def answer_tool_call(name: str, arguments: Any) -> list[TextContent]:
+    """
+    Answer a tool call once the index is loaded.
+
+    Answers are served from response_cache when the same call was already
+    rendered for the current index generation.
+    """
+    if name == "reload":
+        fresh = await reload_index("reload tool")
+        if (arguments or {}).get("format") == "json":
+            return [TextContent(type="text", text=_compact_json({
+                'generation': fresh.generation,
+                'metadata_count': len(fresh.metadata),
+                'container_count': len(fresh.singularity_entries),
+                'cache_generated_at': fresh.cache_info.get('generated_at'),
+            }))]
+        return [TextContent(
+            type="text",
+            text=(
+                f"Index reloaded: generation {fresh.generation}, "
+                f"{len(fresh.metadata)} metadata entries, "
+                f"{len(fresh.singularity_entries)} containers "
+                f"(cache generated {fresh.cache_info.get('generated_at')})"
+            )
+        )]
+
+    # Pin the current generation: a reload mid-request must not mix indexes
+    idx = index
+
+    if response_cache.max_chars <= 0:
+        return render_tool_response(idx, name, arguments)
+
+    key = ResponseCache.key(name, arguments, idx.generation)
+    response = response_cache.get(key)
+    if response is None:
+        response = render_tool_response(idx, name, arguments)
+        response_cache.put(key, response, sum(len(content.text) for content in response))
+    return response
+
+
+def render_tool_response(idx: BioFinderIndex, name: str, arguments: Any) -> list[TextContent]:
+    """
+    Render the answer to a tool call against one index generation.
+
     Piece together responses based on available metadata and container information, formatted for user readability.
     """
-    
+    output_format = arguments.get("format", "text")
+    if output_format == "json":
+        return [TextContent(type="text", text=_compact_json(render_tool_json(idx, name, arguments)))]
+    elif output_format != "text":
+        raise ValueError(f"Unknown format: {output_format}")
+
     if name == "find_tool":
         tool_name = arguments["tool_name"]
-        result = index.search_tool(tool_name)
+        # Only the latest and the three next versions are shown
+        result = idx.search_tool(tool_name, limit=4)
         
         # Format response
         response_parts = []
+
+        if result['resolved_name']:
+            response_parts.append(f"\n🔁 No exact match for '{tool_name}', showing results for '{result['resolved_name']}'\n")
+            tool_name = result['resolved_name']
         
         # Tool information
         if result['metadata']:
@@ -427,7 +1403,10 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             latest = result['containers'][0]
             response_parts.append(f"✨ Most Recent Version: {latest['tag']}\n\n")
             response_parts.append(f"   Path: {latest['path']}\n")
-            response_parts.append(f"   Size: {latest['size_bytes'] / (1024**2):.1f} MB\n\n")
+            response_parts.append(f"   Size: {latest['size_bytes'] / (1024**2):.1f} MB\n")
+            if latest.row in idx.suspects:
+                response_parts.append(f"   ⚠️  {_suspect_note(idx, latest)}\n")
+            response_parts.append("\n")
             
             # Usage example
             response_parts.append(f"{'─'*70}\n")
@@ -449,20 +1428,62 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                         f"  {i:2}. {container['tag']}\n"
                         f"      {container['path']}\n"
                     )
-                if len(result['containers']) > 3:
-                    response_parts.append(f"   ... and {len(result['containers']) - 3} more versions\n")
+                    if container.row in idx.suspects:
+                        response_parts.append(f"      ⚠️  {_suspect_note(idx, container)}\n")
+                if result['container_count'] > 3:
+                    response_parts.append(f"   ... and {result['container_count'] - 3} more versions\n")
         else:
             response_parts.append(f"\n⚠️  WARNING: No containers found in CVMFS for this tool\n")
             response_parts.append(f"   The tool may be available through other means or under a different name.\n")
+
+        if result['suggestions']:
+            response_parts.append(f"\n💡 Did you mean: {', '.join(result['suggestions'])}?\n")
         
         response_parts.append(f"\n{'='*70}\n")
         return [TextContent(type="text", text="".join(response_parts))]
     
+    elif name == "find_tools":
+        include_versions = arguments.get("include_versions", False)
+        tool_names = _batch_names(arguments)
+        limit = None if include_versions else 1
+        results = [(tool_name, idx.search_tool(tool_name, limit=limit)) for tool_name in tool_names]
+        found = sum(1 for _, result in results if result['containers'])
+
+        response_parts = []
+        response_parts.append(
+            f"# Batch lookup: {found} of {len(results)} names have containers\n\n"
+        )
+
+        for tool_name, result in results:
+            if result['resolved_name']:
+                response_parts.append(f"## {tool_name} → {result['resolved_name']}\n")
+            else:
+                response_parts.append(f"## {tool_name}\n")
+
+            if result['containers']:
+                latest = result['containers'][0]
+                response_parts.append(f"- Latest: {latest['tag']}\n")
+                response_parts.append(f"- Path: `{latest['path']}`\n")
+                response_parts.append(f"- Versions: {result['container_count']}\n")
+                if latest.row in idx.suspects:
+                    response_parts.append(f"- ⚠️ {_suspect_note(idx, latest)}\n")
+                if include_versions:
+                    for container in result['containers'][1:]:
+                        response_parts.append(f"  - {container['tag']}: `{container['path']}`\n")
+            else:
+                response_parts.append("- No containers found\n")
+
+            if result['suggestions']:
+                response_parts.append(f"- Did you mean: {', '.join(result['suggestions'])}?\n")
+            response_parts.append("\n")
+
+        return [TextContent(type="text", text="".join(response_parts))]
+    
     elif name == "search_by_function":
         description = arguments["description"]
         limit = arguments.get("limit", 10)
         
-        results = index.search_by_description(description)
+        results = idx.search_by_description(description, limit)
         
         if not results:
             return [TextContent(
@@ -474,7 +1495,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         response_parts.append(f"\n{'='*70}\n")
         response_parts.append(f"🔎 TOOLS MATCHING: {description}\n")
         response_parts.append(f"{'='*70}\n\n")
-        response_parts.append(f"Found {len(results)} matching tools.\n")
+        response_parts.append(f"Top {len(results)} matching tools, best match first.\n\n")
         
         for i, tool_name in enumerate(results, 1):
             response_parts.append(f"{i:2}. {tool_name}\n")
@@ -483,53 +1504,395 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     
     elif name == "get_container_versions":
         tool_name = arguments["tool_name"]
-        result = index.search_tool(tool_name)
+        result, offset, next_cursor = _versions_page(idx, arguments)
         
-        if not result['containers']:
-            return [TextContent(
-                type="text",
-                text=f"No containers found for '{tool_name}'"
-            )]
+        if not result['container_count']:
+            text = f"No containers found for '{tool_name}'"
+            if result['suggestions']:
+                text += f"\nDid you mean: {', '.join(result['suggestions'])}?"
+            return [TextContent(type="text", text=text)]
         
-        response_parts = [f"# Container Versions for {tool_name}\n\n"]
-        response_parts.append(f"Total versions: {len(result['containers'])}\n\n")
+        response_parts = []
+        if result['resolved_name']:
+            response_parts.append(f"No exact match for '{tool_name}', showing '{result['resolved_name']}'\n\n")
+            tool_name = result['resolved_name']
+        response_parts.append(f"# Container Versions for {tool_name}\n\n")
+        response_parts.append(f"Total versions: {result['container_count']}\n\n")
+        if len(result['containers']) < result['container_count']:
+            response_parts.append(
+                f"Showing versions {offset + 1}-{offset + len(result['containers'])}\n\n"
+            )
         
         for container in result['containers']:
             response_parts.append(f"## Version {container['tag']}\n")
             response_parts.append(f"- Path: `{container['path']}`\n")
             response_parts.append(f"- Size: {container['size_bytes'] / (10242):.1f} MB\n")
-            response_parts.append(f"- Modified: {datetime.fromtimestamp(container['mtime']).strftime('%Y-%m-%d')}\n\n")
+            response_parts.append(f"- Modified: {datetime.fromtimestamp(container['mtime']).strftime('%Y-%m-%d')}\n")
+            if container.row in idx.suspects:
+                response_parts.append(f"- ⚠️ {_suspect_note(idx, container)}\n")
+            response_parts.append("\n")
+        
+        if next_cursor:
+            response_parts.append(f"Next page cursor: {next_cursor}\n")
         
         return [TextContent(type="text", text="".join(response_parts))]
     
     elif name == "list_available_tools":
-        limit = arguments.get("limit", 50)
-        tools = index.list_all_tools(limit)
+        tools, offset, next_cursor = _catalog_page(idx, arguments, default_limit=50)
         
         response = f"# Available Bioinformatics Tools ({len(tools)} shown)\n\n"
         response += "\n".join(f"- {tool}" for tool in tools)
+        if next_cursor:
+            response += f"\n\nNext page cursor: {next_cursor}"
         
         return [TextContent(type="text", text=response)]
     
+    elif name == "autocomplete":
+        prefix = arguments["prefix"]
+        limit = arguments.get("limit", 20)
+        names, total = idx.autocomplete(prefix, limit)
+
+        response = f"# Tools starting with '{prefix}' ({len(names)} of {total} shown)\n\n"
+        response += "\n".join(f"- {tool}" for tool in names)
+
+        return [TextContent(type="text", text=response)]
+    
+    else:
+        raise ValueError(f"Unknown tool: {name}")
+
+
+def encode_cursor(**position: Any) -> str:
+    """Opaque pagination cursor holding `position` (offset, generation, query)."""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, generation: int, **expected: Any) -> int:
+    """
+    Offset stored in a cursor made by encode_cursor().
+
+    Raises ValueError if the cursor is malformed, was issued for another
+    query, or predates the current index generation (a reload may have
+    shifted every position, so it cannot be resumed).
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset = int(position["o"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if offset < 0 or any(position.get(key) != value for key, value in expected.items()):
+        raise ValueError(f"Cursor does not belong to this request: {cursor}")
+    if position.get("g") != generation:
+        raise ValueError("The index was reloaded since this cursor was issued; start again from the first page")
+    return offset
+
+
+def _page_limit(arguments: Any, default_limit: Optional[int]) -> Optional[int]:
+    limit = arguments.get("limit", default_limit)
+    if limit is not None and limit < 1:
+        raise ValueError("limit must be at least 1")
+    return limit
+
+
+def _versions_page(idx: BioFinderIndex, arguments: Any) -> Tuple[Dict[str, Any], int, Optional[str]]:
+    """
+    get_container_versions page: (search_tool result, offset, next cursor).
+
+    Without `limit` every version from the cursor on is returned.
+    """
+    tool_name = arguments["tool_name"]
+    limit = _page_limit(arguments, None)
+    offset = 0
+    if arguments.get("cursor"):
+        offset = decode_cursor(arguments["cursor"], idx.generation, q=tool_name)
+
+    result = idx.search_tool(tool_name, offset, limit)
+    end = offset + len(result['containers'])
+    next_cursor = None
+    if end < result['container_count']:
+        next_cursor = encode_cursor(o=end, g=idx.generation, q=tool_name)
+    return result, offset, next_cursor
+
+
+def _catalog_page(idx: BioFinderIndex, arguments: Any, default_limit: int) -> Tuple[List[str], int, Optional[str]]:
+    """Page of the sorted tool catalog: (names, offset, next cursor)."""
+    limit = _page_limit(arguments, default_limit)
+    offset = 0
+    if arguments.get("cursor"):
+        offset = decode_cursor(arguments["cursor"], idx.generation)
+
+    tools = idx.list_all_tools(limit, offset)
+    end = offset + len(tools)
+    next_cursor = encode_cursor(o=end, g=idx.generation) if end < len(idx.catalog) else None
+    return tools, offset, next_cursor
+
+
+def _batch_names(arguments: Any) -> List[str]:
+    """find_tools names in the caller's order, without blanks or repeats."""
+    return list(dict.fromkeys(n.strip() for n in arguments["tool_names"] if n.strip()))
+
+
+def _compact_json(data: Any) -> str:
+    """JSON without indentation or spaces after separators."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _suspect_note(idx: BioFinderIndex, container: ContainerRef) -> str:
+    """Warning line for a container the background verifier flagged."""
+    status = idx.suspects[container.row]
+    problem = {
+        MISSING: "image is missing from CVMFS",
+        CHANGED: "image changed on CVMFS since the cache was generated",
+        TIMEOUT: "image did not respond to stat on CVMFS",
+    }[status]
+    return f"Verification {idx.verification['verified_at'][:19]}: {problem}"
+
+
+def _container_json(idx: BioFinderIndex, container: ContainerRef) -> Dict[str, Any]:
+    """Fields of a container worth sending; the rest derive from the path."""
+    data = {
+        'tag': container['tag'],
+        'path': container['path'],
+        'size_bytes': container['size_bytes'],
+        'mtime': container['mtime'],
+    }
+    if container.row in idx.suspects:
+        data['suspect'] = idx.suspects[container.row]
+    return data
+
+
+def _lookup_json(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields shared by every name-lookup tool's JSON answer."""
+    return {
+        'query': result['query'],
+        'resolved_name': result['resolved_name'],
+        'container_count': result['container_count'],
+        'suggestions': result['suggestions'],
+    }
+
+
+def render_tool_json(idx: BioFinderIndex, name: str, arguments: Any) -> Dict[str, Any]:
+    """
+    Structured answer to a tool call, for `format: "json"`.
+
+    Fields come straight from search_tool/search_by_description, projected to
+    what a consumer needs; nothing is rendered as text.
+    """
+    if name == "find_tool":
+        result = idx.search_tool(arguments["tool_name"], limit=1)
+        meta = result['metadata'] or {}
+        return {
+            **_lookup_json(result),
+            'metadata': {
+                'id': meta.get('id'),
+                'name': meta.get('name'),
+                'description': meta.get('description'),
+                'homepage': meta.get('homepage'),
+                'operations': meta.get('edam-operations') or [],
+            } if result['metadata'] else None,
+            'latest': _container_json(idx, result['containers'][0]) if result['containers'] else None,
+        }
+
+    elif name == "find_tools":
+        include_versions = arguments.get("include_versions", False)
+        tool_names = _batch_names(arguments)
+        results = []
+        for tool_name in tool_names:
+            result = idx.search_tool(tool_name, limit=None if include_versions else 1)
+            item = _lookup_json(result)
+            item['latest'] = _container_json(idx, result['containers'][0]) if result['containers'] else None
+            if include_versions:
+                item['containers'] = [_container_json(idx, container) for container in result['containers']]
+            results.append(item)
+        return {'results': results}
+
+    elif name == "search_by_function":
+        description = arguments["description"]
+        return {
+            'query': description,
+            'tools': idx.search_by_description(description, arguments.get("limit", 10)),
+        }
+
+    elif name == "get_container_versions":
+        result, _, next_cursor = _versions_page(idx, arguments)
+        return {
+            **_lookup_json(result),
+            'containers': [_container_json(idx, container) for container in result['containers']],
+            'next_cursor': next_cursor,
+        }
+
+    elif name == "list_available_tools":
+        tools, _, next_cursor = _catalog_page(idx, arguments, default_limit=50)
+        return {'tools': tools, 'next_cursor': next_cursor}
+
+    elif name == "autocomplete":
+        names, total = idx.autocomplete(arguments["prefix"], arguments.get("limit", 20))
+        return {'prefix': arguments["prefix"], 'tools': names, 'total': total}
+
     else:
         raise ValueError(f"Unknown tool: {name}")
 
 
-async def main():
-    """Run the MCP server."""
-    # Load data
-    #print("Initializing BioFinder MCP Server...")
-    index.load_data()
-    #print("Ready to serve requests!")
+async def main(http_address: Optional[str] = None, socket_path: Optional[str] = None):
+    """Run the MCP server, over stdio unless a daemon address is given."""
+    global index_ready, reload_lock, query_log
+    index_ready = asyncio.Event()
+    reload_lock = asyncio.Lock()
+    if QUERY_LOG:
+        try:
+            query_log = QueryLog(QUERY_LOG)
+            log.info(f"Logging tool calls to {QUERY_LOG}")
+        except OSError as e:
+            log.warning(f"Could not open query log {QUERY_LOG}: {e}")
+    if TRACEMALLOC:
+        # Before loading, so the index's own allocations are traced
+        tracemalloc.start()
+
+    # Load data in the background so `initialize` is answered straight away
+    loader = asyncio.create_task(_load_index())
+    background = [loader]
+
+    # `kill -HUP <pid>` reloads the data files
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(
+            signal.SIGHUP, lambda: background.append(asyncio.create_task(_reload_quietly("SIGHUP")))
+        )
+    except (AttributeError, NotImplementedError):
+        pass  # no SIGHUP on this platform
+
+    if WATCH_INTERVAL > 0:
+        background.append(asyncio.create_task(watch_data_files(WATCH_INTERVAL)))
+    if VERIFY_INTERVAL > 0:
+        background.append(asyncio.create_task(verify_containers(VERIFY_INTERVAL, VERIFY_SAMPLE)))
+    if STATS_INTERVAL > 0:
+        background.append(asyncio.create_task(log_stats(STATS_INTERVAL)))
     
     # Run server
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+    try:
+        if http_address or socket_path:
+            await serve_http(http_address, socket_path)
+        else:
+            async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+                await app.run(
+                    read_stream,
+                    write_stream,
+                    app.create_initialization_options()
+                )
+    finally:
+        for task in background:
+            task.cancel()
+
+
+async def serve_http(http_address: Optional[str], socket_path: Optional[str]):
+    """
+    Serve `app` to many concurrent clients over streamable HTTP.
+
+    Listens on a TCP `[HOST:]PORT` or on a Unix socket. Every session shares
+    the one in-memory index, so a login node needs a single daemon instead of
+    a server process per command.
+    """
+    # Imported here so the default stdio mode does not pay for them
+    import socket
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.routing import Route
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+
+    session_manager = StreamableHTTPSessionManager(app=app, json_response=True)
+
+    class MCPEndpoint:
+        """Raw ASGI endpoint (Starlette would wrap a plain function as a Request handler)."""
+        async def __call__(self, scope, receive, send):
+            await session_manager.handle_request(scope, receive, send)
+
+    http_app = Starlette(
+        routes=[Route(HTTP_PATH, endpoint=MCPEndpoint())],
+        lifespan=lambda _: session_manager.run(),
+    )
+    config = uvicorn.Config(http_app, log_level="warning", log_config=None)
+    server = uvicorn.Server(config)
+
+    if socket_path:
+        # Bind the socket ourselves so it can be opened to every local user.
+        # Access is controlled by the directory, which must not be world-writable.
+        _remove_stale_socket(socket_path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(socket_path)
+        bound = os.stat(socket_path)
+        os.chmod(socket_path, 0o666)
+        log.info(f"Serving MCP over HTTP on unix socket {socket_path}")
+        # uvicorn re-raises the signal it shut down on; make SIGTERM unwind
+        # through the finally below instead of killing the process outright
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        try:
+            await server.serve(sockets=[sock])
+        finally:
+            _remove_own_socket(socket_path, bound)
+    else:
+        host, _, port = http_address.rpartition(":")
+        config.host = host or "127.0.0.1"
+        config.port = int(port)
+        log.info(f"Serving MCP over HTTP at http://{config.host}:{config.port}{HTTP_PATH}")
+        await server.serve()
+
+
+def _remove_stale_socket(socket_path: str):
+    """
+    Unlink a leftover socket at `socket_path`.
+
+    Only a socket nobody is listening on is removed. Anything other than a
+    socket is left alone, rather than the daemon deleting a file it was
+    pointed at by mistake, and a live socket means another daemon already
+    serves this path.
+    """
+    import socket
+
+    try:
+        st = os.lstat(socket_path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise RuntimeError(f"{socket_path} exists and is not a socket; refusing to replace it")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except ConnectionRefusedError:
+        os.unlink(socket_path)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"Another daemon is already listening on {socket_path}")
+
+
+def _remove_own_socket(socket_path: str, bound: os.stat_result):
+    """Unlink `socket_path` on shutdown, unless it is no longer the socket this daemon bound."""
+    try:
+        st = os.lstat(socket_path)
+    except FileNotFoundError:
+        return
+    if (st.st_dev, st.st_ino) == (bound.st_dev, bound.st_ino):
+        os.unlink(socket_path)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Command-line options. Without any, the server speaks MCP over stdio."""
+    parser = argparse.ArgumentParser(description="BioFinder MCP server")
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument(
+        "--http", metavar="[HOST:]PORT",
+        help="run as a shared daemon serving streamable HTTP on this address"
+    )
+    transport.add_argument(
+        "--socket", metavar="PATH", nargs="?", const=DEFAULT_SOCKET,
+        help=f"run as a shared daemon on a Unix socket (default {DEFAULT_SOCKET})"
+    )
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    try:
+        asyncio.run(main(http_address=args.http, socket_path=args.socket))
+    except KeyboardInterrupt:
+        pass
@@ -1,6 +1,7 @@
 #!/bin/bash
 # Bio-Finder Module Builder Script for Automated Environments
 # Usage: ./build-modules.sh [tool1] [tool2] [tool3] ...
+#        ./build-modules.sh - manifest.txt   (one tool[/version] per line)
 
 set -euo pipefail
 
@@ -13,25 +14,12 @@ if [[ ! -x "$BIOFINDER" ]]; then
     exit 1
 fi
 
-build_module() {
-    local tool="$1"
-    echo "Building module for: $tool"
-    
-    # Use the command we know works from testing
-    if sudo -E env "PATH=$PATH" "$BIOFINDER" build "$tool"; then
-        echo "✓ Successfully built module for $tool"
-        return 0
-    else
-        echo "✗ Failed to build module for $tool" 
-        return 1
-    fi
-}
-
 # If no arguments provided, show usage
 if [[ $# -eq 0 ]]; then
     echo "Bio-Finder Module Builder for Automated Environments"
     echo ""
     echo "Usage: ./build-modules.sh [tool1] [tool2] [tool3] ..."
+    echo "       ./build-modules.sh - manifest.txt"
     echo ""
     echo "Examples:"
     echo "  ./build-modules.sh samtools"
@@ -50,26 +38,17 @@ echo "=== Bio-Finder Automated Module Builder ==="
 echo "Building modules for: $*"
 echo ""
 
-# Build modules for each tool specified
-success_count=0
-total_count=$#
-
-for tool in "$@"; do
-    if build_module "$tool"; then
-        success_count=$((success_count + 1))
-    fi
+# Build all modules in one run: versions are resolved in one pass, module
+# files are written in parallel and Lmod is refreshed once. Prints a line per
+# tool and a summary, and fails if any tool failed.
+if sudo -E env "PATH=$PATH" "$BIOFINDER" build-many "$@"; then
     echo ""
-done
-
-echo "=== Results ==="
-echo "Successfully built: $success_count/$total_count modules"
-
-if [[ $success_count -eq $total_count ]]; then
     echo "🎉 All modules built successfully!"
     echo ""
     echo "To see available modules: module avail"
     echo "To load a module: module load <tool>/<version>"
 else
+    echo ""
     echo "⚠️ Some modules failed to build"
     exit 1
-fi
\ No newline at end of file
+fi
@@ -0,0 +1,130 @@
+"""
+Columnar storage for the Singularity container cache.
+
+galaxy_singularity_cache.json.gz lists ~118k images as one dict each. Most of
+each dict is redundant: `path` is `cvmfs_root + "/" + entry_name`, and
+`entry_name` is `tool_name + ":" + tag`. ContainerStore keeps only what cannot
+be derived, in flat arrays, and hands out lightweight ContainerRef row views
+that behave like the original dicts for reading.
+"""
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+class ContainerRef:
+    """Read-only, dict-like view of one row of a ContainerStore."""
+
+    __slots__ = ("store", "row")
+
+    KEYS = ("entry_name", "tool_name", "tag", "path", "size_bytes", "mtime")
+
+    def __init__(self, store: "ContainerStore", row: int):
+        self.store = store
+        self.row = row
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self.store, key)(self.row)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self.KEYS else default
+
+    def keys(self):
+        return self.KEYS
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The row in the cache file's original entry format."""
+        return {key: self[key] for key in self.KEYS}
+
+    def __eq__(self, other: object) -> bool:
+        return (isinstance(other, ContainerRef)
+                and other.store is self.store and other.row == self.row)
+
+    def __hash__(self) -> int:
+        return hash((id(self.store), self.row))
+
+    def __repr__(self) -> str:
+        return f"ContainerRef({self['entry_name']!r})"
+
+
+class ContainerStore:
+    """
+    Array-backed store of container entries.
+
+    Tool names are interned once in `tool_names` and referenced by index, tags
+    are concatenated into a single string sliced by offset, and sizes and
+    modification times are packed machine arrays. Paths and entry names are
+    rebuilt on demand. The store is immutable once built.
+    """
+
+    def __init__(self, cvmfs_root: str):
+        self.cvmfs_root = cvmfs_root
+        self.tool_names: List[str] = []
+        self.tool_ids = array("I")
+        self.tag_blob = ""
+        self.tag_offsets = array("I", [0])
+        self.sizes = array("q")
+        self.mtimes = array("d")
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict[str, Any]], cvmfs_root: str) -> "ContainerStore":
+        """Build a store from entries in the cache file's format."""
+        store = cls(cvmfs_root)
+        tool_ids: Dict[str, int] = {}
+        tags = []
+        length = 0
+
+        for entry in entries:
+            tool_name = entry["tool_name"]
+            tool_id = tool_ids.get(tool_name)
+            if tool_id is None:
+                tool_id = tool_ids[tool_name] = len(store.tool_names)
+                store.tool_names.append(tool_name)
+            store.tool_ids.append(tool_id)
+
+            # A missing tag (plain files such as "bin") is stored as empty
+            tag = entry["tag"] or ""
+            tags.append(tag)
+            length += len(tag)
+            store.tag_offsets.append(length)
+
+            store.sizes.append(int(entry["size_bytes"]))
+            store.mtimes.append(float(entry["mtime"]))
+
+        store.tag_blob = "".join(tags)
+        return store
+
+    def __len__(self) -> int:
+        return len(self.tool_ids)
+
+    def __getitem__(self, row: int) -> ContainerRef:
+        if not 0 <= row < len(self.tool_ids):
+            raise IndexError(row)
+        return ContainerRef(self, row)
+
+    def __iter__(self) -> Iterator[ContainerRef]:
+        for row in range(len(self.tool_ids)):
+            yield ContainerRef(self, row)
+
+    def tool_name(self, row: int) -> str:
+        return self.tool_names[self.tool_ids[row]]
+
+    def tag(self, row: int) -> Optional[str]:
+        tag = self.tag_blob[self.tag_offsets[row]:self.tag_offsets[row + 1]]
+        return tag or None
+
+    def entry_name(self, row: int) -> str:
+        tag = self.tag(row)
+        tool_name = self.tool_name(row)
+        return f"{tool_name}:{tag}" if tag else tool_name
+
+    def path(self, row: int) -> str:
+        return f"{self.cvmfs_root}/{self.entry_name(row)}"
+
+    def size_bytes(self, row: int) -> int:
+        return self.sizes[row]
+
+    def mtime(self, row: int) -> float:
+        return self.mtimes[row]
@@ -6,10 +6,26 @@ Builds Lmod module files for tools available in CVMFS.
 """
 
 import os
+import re
+import shutil
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Tuple
-import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from atomic_file import atomic_write
+
+
+# Module files are tiny; the threads mostly wait on the stat of each image on
+# CVMFS and on the (often network) module filesystem
+DEFAULT_BUILD_WORKERS = 8
+
+# The containerPath line of module files written by _create_module_file; only
+# modules containing it are managed (updated or pruned) by reconcile
+GENERATED_MODULE_RE = re.compile(
+    r'^local containerPath = "/cvmfs/singularity\.galaxyproject\.org/all/[^"]+"$', re.MULTILINE
+)
 
 
 class CVMFSModuleBuilder:
@@ -18,90 +34,110 @@ class CVMFSModuleBuilder:
     CVMFS_SINGULARITY_PATH = Path("/cvmfs/singularity.galaxyproject.org/all")
     LMOD_MODULES_PATH = Path("/apps/Modules/modulefiles")
     
-    def __init__(self):
-        """Initialize the module builder."""
-        pass
+    # Lmod system spider cache, as configured in the site's lmodrc.lua
+    # (scDescriptT). Regenerated with update_lmod_system_cache_files, taken
+    # from $BIOFINDER_LMOD_CACHE_UPDATER, $LMOD_DIR or PATH.
+    LMOD_CACHE_DIR = Path(os.environ.get("BIOFINDER_LMOD_CACHE_DIR", "/apps/Modules/cache"))
+    LMOD_TIMESTAMP_FILE = LMOD_CACHE_DIR / "timestamp"
+    LMOD_CACHE_UPDATER = os.environ.get("BIOFINDER_LMOD_CACHE_UPDATER")
+    
+    def __init__(self, index=None):
+        """
+        Initialize the module builder.
+
+        Args:
+            index: A loaded BioFinderIndex to resolve versions from. If None,
+                the server's index (compiled snapshot or raw cache) is loaded
+                on first use.
+        """
+        self.index = index
     
     def _is_cvmfs_available(self) -> bool:
         """Check if CVMFS is mounted and accessible."""
         return self.CVMFS_SINGULARITY_PATH.exists() and self.CVMFS_SINGULARITY_PATH.is_dir()
     
+    def _get_index(self):
+        """The container index, loaded on first use."""
+        if self.index is None:
+            # Imported here: the server module is only needed once a lookup happens
+            from biofinder_server import BioFinderIndex
+            self.index = BioFinderIndex()
+            self.index.load_data()
+        return self.index
+    
     def _get_available_tools(self, tool_name: str) -> List[Tuple[str, str]]:
         """
-        Get available versions of a tool from CVMFS.
+        Get available versions of a tool from the container index.
+        
+        The index mirrors the CVMFS directory (see `biofinder scan`), so this
+        does not touch CVMFS at all.
         
         Args:
             tool_name: Name of the tool to search for
             
         Returns:
-            List of (tool_name, version) tuples
+            List of (tool_name, version) tuples, newest first
         """
-        if not self._is_cvmfs_available():
-            raise RuntimeError("CVMFS not available at /cvmfs/singularity.galaxyproject.org/all")
+        index = self._get_index()
+        rows = index.container_index.get(tool_name.lower(), ())
+        store = index.singularity_entries
         
-        # Search for containers matching the tool name
-        try:
-            containers = []
-            for item in self.CVMFS_SINGULARITY_PATH.iterdir():
-                if item.is_file() or item.is_symlink():
-                    # Container names are like "samtools:1.22" 
-                    name = item.name
-                    if ":" in name:
-                        container_tool, version = name.split(":", 1)
-                        if container_tool.lower() == tool_name.lower():
-                            containers.append((container_tool, version))
-            
-            return containers
-        except (OSError, PermissionError) as e:
-            raise RuntimeError(f"Failed to read CVMFS directory: {e}")
+        # Container names are like "samtools:1.22"; plain files have no tag
+        return [
+            (store.tool_name(row), store.tag(row))
+            for row in rows
+            if store.tag(row) is not None
+        ]
     
-    def _parse_version(self, version_str: str) -> Tuple[int, ...]:
+    def _check_container(self, tool_name: str, version: str) -> Path:
         """
-        Parse version string for semantic sorting.
+        Check that the chosen image exists on CVMFS with a single stat.
         
-        Args:
-            version_str: Version string like "1.21" or "1.22--hdfd78af_0"
-            
         Returns:
-            Tuple of version numbers for sorting
-        """
-        # Extract the main version number before any build suffix
-        version_part = version_str.split("--")[0]
-        
-        # Split on dots and convert to integers where possible
-        parts = []
-        for part in version_part.split("."):
-            # Try to extract numbers from the part
-            numbers = re.findall(r'\d+', part)
-            if numbers:
-                parts.extend(int(num) for num in numbers)
-            else:
-                # For non-numeric parts, use ASCII value of first char
-                parts.append(ord(part[0]) if part else 0)
-        
-        return tuple(parts)
-    
-    def _get_latest_version(self, versions: List[Tuple[str, str]]) -> Tuple[str, str]:
-        """
-        Get the latest version from a list of versions.
-        
-        Args:
-            versions: List of (tool_name, version) tuples
+            Path of the container image
             
-        Returns:
-            The (tool_name, version) tuple with the latest version
+        Raises:
+            RuntimeError: If CVMFS is not mounted
+            ValueError: If the image is missing (the container cache is stale)
         """
-        if not versions:
-            raise ValueError("No versions provided")
+        container_path = self.CVMFS_SINGULARITY_PATH / f"{tool_name}:{version}"
+        if container_path.exists():
+            return container_path
+        if not self._is_cvmfs_available():
+            raise RuntimeError("CVMFS not available at /cvmfs/singularity.galaxyproject.org/all")
+        raise ValueError(
+            f"Container {container_path} is listed in the container cache but not on CVMFS. "
+            f"Run 'biofinder scan' to refresh the cache."
+        )
+    
+    def _module_path(self, tool_name: str, version: str) -> Path:
+        """Where the module file for a tool version lives."""
+        return self.LMOD_MODULES_PATH / tool_name / f"{version}.lua"
+    
+    def _module_content(self, tool_name: str, version: str) -> str:
+        """Lmod module file content for the specified tool and version."""
+        # Container path
+        container_path = f"/cvmfs/singularity.galaxyproject.org/all/{tool_name}:{version}"
         
-        # Sort by version, latest first
-        sorted_versions = sorted(versions, key=lambda x: self._parse_version(x[1]), reverse=True)
-        return sorted_versions[0]
+        return f'''help([[{tool_name.title()} {version} from CVMFS]])
+
+load("singularity")
+
+local containerPath = "{container_path}"
+
+set_alias("{tool_name}",
+  "singularity exec " .. containerPath .. " {tool_name}")
+'''
     
     def _create_module_file(self, tool_name: str, version: str) -> Path:
         """
         Create an Lmod module file for the specified tool and version.
         
+        The file is written to a temporary name and renamed into place, so
+        `module` never reads a partial file. A file that already has this
+        content is left untouched, so its mtime still tells
+        _cache_is_current whether the Lmod cache has seen it.
+        
         Args:
             tool_name: Name of the tool
             version: Version of the tool
@@ -113,8 +149,8 @@ class CVMFSModuleBuilder:
             PermissionError: If unable to write to module directory
         """
         # Create module directory
-        module_dir = self.LMOD_MODULES_PATH / tool_name
-        module_file = module_dir / f"{version}.lua"
+        module_file = self._module_path(tool_name, version)
+        module_dir = module_file.parent
         
         try:
             module_dir.mkdir(parents=True, exist_ok=True)
@@ -124,22 +160,16 @@ class CVMFSModuleBuilder:
                 f"You must run this command with sudo privileges."
             )
         
-        # Container path
-        container_path = f"/cvmfs/singularity.galaxyproject.org/all/{tool_name}:{version}"
-        
-        # Module content
-        module_content = f'''help([[{tool_name.title()} {version} from CVMFS]])
-
-load("singularity")
-
-local containerPath = "{container_path}"
-
-set_alias("{tool_name}",
-  "singularity exec " .. containerPath .. " {tool_name}")
-'''
+        content = self._module_content(tool_name, version)
+        try:
+            if module_file.read_text() == content:
+                return module_file
+        except (OSError, UnicodeDecodeError):
+            pass
         
         try:
-            module_file.write_text(module_content)
+            with atomic_write(module_file) as f:
+                f.write(content)
         except PermissionError:
             raise PermissionError(
                 f"Permission denied writing module file: {module_file}\n"
@@ -148,13 +178,40 @@ set_alias("{tool_name}",
         
         return module_file
     
-    def _refresh_module_cache(self) -> Tuple[bool, str]:
+    def _find_cache_updater(self) -> Optional[str]:
+        """Lmod's update_lmod_system_cache_files script, if installed."""
+        if self.LMOD_CACHE_UPDATER:
+            return self.LMOD_CACHE_UPDATER
+        lmod_dir = os.environ.get("LMOD_DIR")
+        if lmod_dir and (Path(lmod_dir) / "update_lmod_system_cache_files").exists():
+            return str(Path(lmod_dir) / "update_lmod_system_cache_files")
+        return shutil.which("update_lmod_system_cache_files")
+    
+    def _refresh_module_cache(self, written: Optional[List[Path]] = None) -> Tuple[bool, str]:
         """
         Refresh the Lmod module cache.
         
+        With Lmod's update_lmod_system_cache_files available, regenerates the
+        persistent system spider cache in LMOD_CACHE_DIR, so every user's next
+        `module avail` reads the cache instead of walking the module tree.
+        Nothing is regenerated if none of the `written` module files is newer
+        than the cache timestamp, i.e. none was actually rewritten since the
+        last regeneration. Without the script, falls back to
+        `module --ignore_cache avail`.
+        
+        Args:
+            written: Module files the run created or left unchanged (None:
+                unknown, always refresh)
+        
         Returns:
             Tuple of (success, output)
         """
+        updater = self._find_cache_updater()
+        if updater:
+            if written is not None and self._cache_is_current(written):
+                return True, f"Lmod system cache in {self.LMOD_CACHE_DIR} is up to date"
+            return self._update_system_cache(updater)
+        
         try:
             result = subprocess.run(
                 ["module", "--ignore_cache", "avail"],
@@ -168,39 +225,64 @@ set_alias("{tool_name}",
         except Exception as e:
             return False, f"Error running module command: {e}"
     
-    def list_versions(self, tool_name: str) -> List[str]:
+    def _cache_is_current(self, written: List[Path]) -> bool:
+        """True if the cache timestamp is newer than every written module file."""
+        try:
+            cached_at = self.LMOD_TIMESTAMP_FILE.stat().st_mtime
+            return all(path.stat().st_mtime < cached_at for path in written)
+        except OSError:
+            return False
+    
+    def _update_system_cache(self, updater: str) -> Tuple[bool, str]:
         """
-        List available versions of a tool without creating a module.
+        Regenerate the spider cache and swap it in atomically.
         
-        Args:
-            tool_name: Name of the tool
-            
-        Returns:
-            List of version strings
+        The cache is built in a scratch directory next to LMOD_CACHE_DIR, its
+        files are renamed into place, and the timestamp is replaced last, so
+        Lmod never trusts a half-written cache.
         """
-        versions = self._get_available_tools(tool_name)
-        if not versions:
-            return []
+        try:
+            self.LMOD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            scratch = Path(tempfile.mkdtemp(dir=self.LMOD_CACHE_DIR, prefix=".update."))
+        except OSError as e:
+            return False, f"Cannot write Lmod cache directory {self.LMOD_CACHE_DIR}: {e}"
         
-        # Sort versions newest first
-        sorted_versions = sorted(versions, key=lambda x: self._parse_version(x[1]), reverse=True)
-        return [version for _, version in sorted_versions]
+        try:
+            scratch_timestamp = scratch / self.LMOD_TIMESTAMP_FILE.name
+            result = subprocess.run(
+                [updater, "-d", str(scratch), "-t", str(scratch_timestamp), str(self.LMOD_MODULES_PATH)],
+                capture_output=True,
+                text=True,
+                check=False
+            )
+            if result.returncode != 0:
+                return False, f"{updater} failed: {result.stderr.strip()}"
+            
+            for item in scratch.iterdir():
+                if item != scratch_timestamp:
+                    os.replace(item, self.LMOD_CACHE_DIR / item.name)
+            if not scratch_timestamp.exists():
+                scratch_timestamp.touch()
+            os.replace(scratch_timestamp, self.LMOD_TIMESTAMP_FILE)
+            return True, f"Lmod system cache updated in {self.LMOD_CACHE_DIR}"
+        except OSError as e:
+            return False, f"Error updating Lmod system cache: {e}"
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
     
-    def build_module(self, tool_spec: str, force_version: Optional[str] = None) -> Tuple[str, str, Path]:
+    def _resolve(self, tool_spec: str, force_version: Optional[str] = None) -> Tuple[str, str]:
         """
-        Build an Lmod module for a tool.
+        Resolve a tool specification to the (tool_name, version) to build.
         
         Args:
             tool_spec: Tool specification like "samtools" or "samtools/1.21"
             force_version: Force a specific version (overrides tool_spec version)
             
         Returns:
-            Tuple of (tool_name, version, module_file_path)
+            Tuple of (tool_name, version)
             
         Raises:
             ValueError: If tool not found or version not available
-            RuntimeError: If CVMFS not available
-            PermissionError: If unable to create module files
         """
         # Parse tool specification
         if "/" in tool_spec and force_version is None:
@@ -213,7 +295,10 @@ set_alias("{tool_name}",
         available_versions = self._get_available_tools(tool_name)
         
         if not available_versions:
-            raise ValueError(f"Tool '{tool_name}' not found in CVMFS")
+            raise ValueError(
+                f"Tool '{tool_name}' not found in the container cache "
+                f"(run 'biofinder scan' if it was published recently)"
+            )
         
         # Determine version to use
         if requested_version:
@@ -231,12 +316,229 @@ set_alias("{tool_name}",
             final_tool, final_version = matching_versions[0]
         else:
             # Use latest version
-            final_tool, final_version = self._get_latest_version(available_versions)
+            final_tool, final_version = available_versions[0]
+        
+        return final_tool, final_version
+    
+    def list_versions(self, tool_name: str) -> List[str]:
+        """
+        List available versions of a tool without creating a module.
+        
+        Args:
+            tool_name: Name of the tool
+            
+        Returns:
+            List of version strings, newest first
+        """
+        # Already sorted newest first by the index
+        return [version for _, version in self._get_available_tools(tool_name)]
+    
+    def build_module(self, tool_spec: str, force_version: Optional[str] = None) -> Tuple[str, str, Path]:
+        """
+        Build an Lmod module for a tool.
+        
+        Args:
+            tool_spec: Tool specification like "samtools" or "samtools/1.21"
+            force_version: Force a specific version (overrides tool_spec version)
+            
+        Returns:
+            Tuple of (tool_name, version, module_file_path)
+            
+        Raises:
+            ValueError: If tool not found or version not available
+            RuntimeError: If CVMFS not available
+            PermissionError: If unable to create module files
+        """
+        final_tool, final_version = self._resolve(tool_spec, force_version)
+        
+        # The only CVMFS access of a build
+        self._check_container(final_tool, final_version)
         
         # Create module file
         module_file = self._create_module_file(final_tool, final_version)
         
         return final_tool, final_version, module_file
+    
+    def build_many(self, tool_specs: List[str], workers: int = DEFAULT_BUILD_WORKERS) -> Tuple[List[Dict[str, Any]], bool, str]:
+        """
+        Build Lmod modules for many tools at once.
+        
+        Resolves every specification against the index in one pass, then
+        checks the images and writes the module files on a thread pool, and
+        refreshes the Lmod cache once at the end. A failing tool does not stop
+        the others.
+        
+        Args:
+            tool_specs: Tool specifications like "samtools" or "samtools/1.21"
+            workers: Number of threads writing module files
+            
+        Returns:
+            Tuple of (per-spec results in input order, Lmod refresh success,
+            refresh output). Each result has 'spec', 'tool_name', 'version',
+            'module_file' and 'error' (None on success).
+        """
+        results = []
+        resolved = []
+        for spec in dict.fromkeys(tool_specs):
+            result = {'spec': spec, 'tool_name': None, 'version': None, 'module_file': None, 'error': None}
+            try:
+                result['tool_name'], result['version'] = self._resolve(spec)
+                resolved.append(result)
+            except ValueError as e:
+                result['error'] = str(e)
+            results.append(result)
+        
+        def write(result: Dict[str, Any]):
+            try:
+                self._check_container(result['tool_name'], result['version'])
+                result['module_file'] = self._create_module_file(result['tool_name'], result['version'])
+            except (ValueError, RuntimeError, OSError) as e:
+                result['error'] = str(e)
+        
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            list(pool.map(write, resolved))
+        
+        written = [result['module_file'] for result in results if result['module_file']]
+        if written:
+            refreshed, output = self._refresh_module_cache(written)
+        else:
+            refreshed, output = False, "No modules were written"
+        return results, refreshed, output
+
+    
+    def _installed_modules(self) -> Dict[Tuple[str, str], Tuple[Path, str]]:
+        """
+        Module files under LMOD_MODULES_PATH that this builder generated.
+        
+        Returns:
+            Dict of (tool_name, version) -> (module file path, content). Module
+            files written by hand or by other tools are left out, so reconcile
+            never touches them.
+        """
+        installed = {}
+        try:
+            tool_dirs = [entry for entry in os.scandir(self.LMOD_MODULES_PATH) if entry.is_dir()]
+        except FileNotFoundError:
+            return installed
+        
+        for tool_dir in tool_dirs:
+            for entry in os.scandir(tool_dir.path):
+                if not entry.name.endswith(".lua") or entry.name.startswith("."):
+                    continue
+                try:
+                    content = Path(entry.path).read_text()
+                except (OSError, UnicodeDecodeError):
+                    continue
+                if GENERATED_MODULE_RE.search(content):
+                    version = entry.name[:-len(".lua")]
+                    installed[(tool_dir.name, version)] = (Path(entry.path), content)
+        return installed
+    
+    def reconcile(
+        self,
+        tool_specs: List[str],
+        prune: bool = False,
+        dry_run: bool = False,
+        workers: int = DEFAULT_BUILD_WORKERS,
+    ) -> Tuple[List[Dict[str, Any]], bool, str]:
+        """
+        Bring the module tree in line with a desired-state manifest.
+        
+        Compares the resolved specs with the generated modules already
+        installed, then writes only missing or changed module files and, with
+        `prune`, deletes generated modules whose container image is no longer
+        in the index. Unchanged files are not touched, so a nightly sync only
+        writes where something changed.
+        
+        Args:
+            tool_specs: Desired modules, like "samtools" (latest) or "samtools/1.21"
+            prune: Remove generated modules whose image has disappeared
+            dry_run: Only compute the plan
+            workers: Number of threads writing module files
+            
+        Returns:
+            Tuple of (plan, Lmod refresh success, refresh output). Each plan
+            item has 'action' (create, update, unchanged, prune or error),
+            'spec', 'tool_name', 'version', 'path' and 'error' (None unless
+            the action failed or the spec could not be resolved).
+        """
+        installed = self._installed_modules()
+        plan = []
+        desired = set()
+        
+        for spec in dict.fromkeys(tool_specs):
+            item = {'action': 'error', 'spec': spec, 'tool_name': None, 'version': None, 'path': None, 'error': None}
+            try:
+                tool_name, version = self._resolve(spec)
+            except ValueError as e:
+                item['error'] = str(e)
+                plan.append(item)
+                continue
+            
+            if (tool_name, version) in desired:
+                continue  # e.g. "samtools" and "samtools/<latest>"
+            desired.add((tool_name, version))
+            
+            current = installed.get((tool_name, version))
+            if current is None:
+                action = 'create'
+            elif current[1] != self._module_content(tool_name, version):
+                action = 'update'
+            else:
+                action = 'unchanged'
+            item.update(action=action, tool_name=tool_name, version=version,
+                        path=self._module_path(tool_name, version))
+            plan.append(item)
+        
+        if prune:
+            available: Dict[str, set] = {}
+            for (tool_name, version), (path, _) in sorted(installed.items()):
+                if (tool_name, version) in desired:
+                    continue
+                if tool_name not in available:
+                    available[tool_name] = {v for _, v in self._get_available_tools(tool_name)}
+                if version not in available[tool_name]:
+                    plan.append({'action': 'prune', 'spec': f"{tool_name}/{version}", 'tool_name': tool_name,
+                                 'version': version, 'path': path, 'error': None})
+        
+        if dry_run:
+            return plan, True, "Dry run: nothing was changed"
+        
+        def write(item: Dict[str, Any]):
+            try:
+                self._check_container(item['tool_name'], item['version'])
+                self._create_module_file(item['tool_name'], item['version'])
+            except (ValueError, RuntimeError, OSError) as e:
+                item['error'] = str(e)
+        
+        to_write = [item for item in plan if item['action'] in ('create', 'update')]
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            list(pool.map(write, to_write))
+        
+        pruned = False
+        for item in plan:
+            if item['action'] != 'prune':
+                continue
+            try:
+                item['path'].unlink()
+                pruned = True
+            except OSError as e:
+                item['error'] = str(e)
+                continue
+            try:
+                item['path'].parent.rmdir()  # only succeeds once the tool has no modules left
+            except OSError:
+                pass
+        
+        written = [item['path'] for item in to_write if not item['error']]
+        if pruned:
+            # Removals do not show up in file times, so always regenerate
+            refreshed, output = self._refresh_module_cache()
+        elif written:
+            refreshed, output = self._refresh_module_cache(written)
+        else:
+            refreshed, output = True, "Module tree already up to date"
+        return plan, refreshed, output
 
 
 def format_versions_list(versions: List[str]) -> str:
@@ -251,6 +553,67 @@ def format_versions_list(versions: List[str]) -> str:
     return "\n".join(lines)
 
 
+def format_build_many_output(results: List[Dict[str, Any]], refreshed: bool, refresh_output: str) -> str:
+    """Format the build-many command output: one line per tool, then a summary."""
+    lines = []
+    for result in results:
+        if result['error']:
+            lines.append(f"✗ {result['spec']}: {result['error']}")
+        else:
+            lines.append(f"✓ {result['spec']} → {result['tool_name']}/{result['version']}")
+    
+    built = sum(1 for result in results if not result['error'])
+    lines.append("")
+    lines.append(f"Successfully built: {built}/{len(results)} modules")
+    if built and not refreshed:
+        lines.append(f"Warning: Lmod cache not refreshed: {refresh_output}")
+    if built:
+        lines.append("")
+        lines.append("To load:")
+        lines.append("    module load <tool>/<version>")
+    
+    return "\n".join(lines)
+
+
+RECONCILE_SYMBOLS = {'create': '+', 'update': '~', 'prune': '-', 'error': '!'}
+
+
+def format_reconcile_output(
+    plan: List[Dict[str, Any]],
+    dry_run: bool,
+    refreshed: bool,
+    refresh_output: str
+) -> str:
+    """Format the reconcile command output: changed modules, then counts."""
+    lines = []
+    counts = {action: 0 for action in ('create', 'update', 'prune', 'unchanged', 'error')}
+    for item in plan:
+        if item['error']:
+            counts['error'] += 1
+            lines.append(f"! {item['spec']}: {item['error']}")
+            continue
+        counts[item['action']] += 1
+        if item['action'] != 'unchanged':
+            lines.append(f"{RECONCILE_SYMBOLS[item['action']]} {item['action']:<6} {item['tool_name']}/{item['version']}")
+    
+    if lines:
+        lines.append("")
+    if dry_run:
+        lines.append(
+            f"Plan: {counts['create']} to create, {counts['update']} to update, "
+            f"{counts['prune']} to prune, {counts['unchanged']} unchanged, {counts['error']} failed"
+        )
+    else:
+        lines.append(
+            f"Done: {counts['create']} created, {counts['update']} updated, "
+            f"{counts['prune']} pruned, {counts['unchanged']} unchanged, {counts['error']} failed"
+        )
+    if not dry_run and not refreshed:
+        lines.append(f"Warning: Lmod cache not refreshed: {refresh_output}")
+    
+    return "\n".join(lines)
+
+
 def format_build_output(
     tool_name: str, 
     version: str, 
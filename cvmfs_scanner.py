@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+CVMFS Scanner
+
+Regenerates galaxy_singularity_cache.json.gz by scanning the Galaxy
+Singularity directory on CVMFS.
+"""
+
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from atomic_file import atomic_write
+
+
+DEFAULT_CVMFS_ROOT = "/cvmfs/singularity.galaxyproject.org/all"
+
+# Directory entries handed to each worker at a time. Large enough to amortise
+# scheduling overhead, small enough to keep every worker busy.
+STAT_BATCH_SIZE = 256
+
+# CVMFS stat latency is dominated by round-trips, not CPU, so many more
+# threads than cores pay off
+DEFAULT_WORKERS = 32
+
+# A scan that finds fewer than this fraction of the previous cache's entries
+# is not written without --force. An unmounted or glitched automount lists as
+# empty or short, and running servers reload the cache file on change.
+MIN_KEPT_FRACTION = 0.5
+
+
+def load_previous_cache(cache_file: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Entries of an existing cache file, keyed by entry name.
+
+    Returns an empty dict if the file is missing or unreadable, in which case
+    every entry is stat'ed from scratch.
+    """
+    try:
+        with gzip.open(cache_file, 'rt') as f:
+            cache_data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {entry['entry_name']: entry for entry in cache_data.get('entries', [])}
+
+
+def _split_entry_name(entry_name: str) -> Tuple[str, Optional[str]]:
+    """Split "samtools:1.22--h96c455f_0" into tool name and tag."""
+    if ":" in entry_name:
+        tool_name, tag = entry_name.split(":", 1)
+        return tool_name, tag
+    return entry_name, None
+
+
+def _stat_batch(
+    root: str,
+    names: List[str],
+    previous: Dict[str, Dict[str, Any]],
+    trust_names: bool,
+) -> Tuple[List[Dict[str, Any]], int, int]:
+    """
+    Build cache entries for a batch of directory entry names.
+
+    An entry whose name is in the previous cache is reused if its mtime and
+    size are unchanged. With `trust_names` it is reused without a stat at all.
+
+    Returns (entries, reused count, error count).
+    """
+    entries = []
+    reused = 0
+    errors = 0
+
+    for name in names:
+        path = f"{root}/{name}"
+        old = previous.get(name)
+        if old is not None and old.get('path') != path:
+            # Previous cache was for a different root
+            old = None
+        if old is not None and trust_names:
+            entries.append(old)
+            reused += 1
+            continue
+
+        try:
+            # Follows symlinks: the size of interest is the image's
+            st = os.stat(path)
+        except OSError:
+            # Removed between readdir and stat, or unreadable
+            errors += 1
+            continue
+
+        if old is not None and old['mtime'] == st.st_mtime and old['size_bytes'] == st.st_size:
+            entries.append(old)
+            reused += 1
+            continue
+
+        tool_name, tag = _split_entry_name(name)
+        entries.append({
+            'entry_name': name,
+            'tool_name': tool_name,
+            'tag': tag,
+            'path': path,
+            'size_bytes': st.st_size,
+            'mtime': st.st_mtime,
+        })
+
+    return entries, reused, errors
+
+
+def scan_cvmfs(
+    root: str = DEFAULT_CVMFS_ROOT,
+    previous: Optional[Dict[str, Dict[str, Any]]] = None,
+    workers: int = DEFAULT_WORKERS,
+    trust_names: bool = False,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Scan a CVMFS Singularity directory into the cache file format.
+
+    The directory is listed once with os.scandir, then entries are stat'ed
+    in batches on a bounded thread pool.
+
+    Args:
+        root: Directory to scan
+        previous: Entries of the previous cache (see load_previous_cache)
+        workers: Number of stat threads
+        trust_names: Reuse previous entries by name without any stat. Safe for
+            CVMFS, where a published image name is never rewritten.
+
+    Returns:
+        Tuple of (cache data, scan statistics)
+
+    Raises:
+        RuntimeError: If the directory cannot be listed
+    """
+    previous = previous or {}
+    root = str(root).rstrip("/") or "/"
+    start = time.perf_counter()
+
+    try:
+        with os.scandir(root) as it:
+            names = [entry.name for entry in it if not entry.name.startswith(".")]
+    except OSError as e:
+        raise RuntimeError(f"Failed to read {root}: {e}")
+    listed = time.perf_counter()
+
+    batches = [names[i:i + STAT_BATCH_SIZE] for i in range(0, len(names), STAT_BATCH_SIZE)]
+    entries: List[Dict[str, Any]] = []
+    reused = 0
+    errors = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for batch_entries, batch_reused, batch_errors in pool.map(
+            lambda batch: _stat_batch(root, batch, previous, trust_names), batches
+        ):
+            entries.extend(batch_entries)
+            reused += batch_reused
+            errors += batch_errors
+
+    entries.sort(key=lambda entry: entry['entry_name'])
+    elapsed = time.perf_counter() - start
+
+    cache_data = {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'cvmfs_root': root,
+        'entry_count': len(entries),
+        'entries': entries,
+        'tool_names': sorted({entry['tool_name'] for entry in entries}),
+    }
+    stats = {
+        'entries': len(entries),
+        'reused': reused,
+        'statted': len(entries) - reused,
+        'errors': errors,
+        'list_seconds': listed - start,
+        'elapsed_seconds': elapsed,
+        'entries_per_second': len(names) / elapsed if elapsed > 0 else 0.0,
+    }
+    return cache_data, stats
+
+
+def check_entry_count(entry_count: int, previous_count: int) -> Optional[str]:
+    """
+    Reason not to replace a cache of `previous_count` entries with a scan of
+    `entry_count` entries, or None if the scan looks sane.
+    """
+    if entry_count == 0:
+        return "scan found no entries"
+    if entry_count < previous_count * MIN_KEPT_FRACTION:
+        return (f"scan found {entry_count} entries, fewer than {MIN_KEPT_FRACTION:.0%} "
+                f"of the {previous_count} in the previous cache")
+    return None
+
+
+def write_cache(cache_data: Dict[str, Any], cache_file: Path):
+    """Write a cache file atomically (temp file + rename)."""
+    with atomic_write(cache_file, 'wb') as raw, gzip.open(raw, 'wt') as f:
+        json.dump(cache_data, f)
+
+
+def format_scan_output(stats: Dict[str, Any], cache_file: Path) -> str:
+    """Format the scan command output."""
+    lines = [
+        f"Scanned {stats['entries']} entries in {stats['elapsed_seconds']:.2f} s "
+        f"({stats['entries_per_second']:.0f} entries/s, listing took {stats['list_seconds']:.2f} s)",
+        f"  Reused from previous cache: {stats['reused']}",
+        f"  Stat'ed: {stats['statted']}",
+    ]
+    if stats['errors']:
+        lines.append(f"  Skipped (stat failed): {stats['errors']}")
+    lines.append("")
+    lines.append(f"Cache written to {cache_file}")
+    return "\n".join(lines)
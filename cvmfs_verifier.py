@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+CVMFS Verifier
+
+Checks cached container entries against CVMFS: stats their paths concurrently
+and reports images that are missing or whose size or mtime changed since the
+cache was generated.
+"""
+
+import asyncio
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from container_store import ContainerStore
+from cvmfs_scanner import DEFAULT_WORKERS
+
+# Seconds before a single stat is reported as timed out. A hung stat keeps its
+# thread, so that lane stops taking work; once every lane has hung, the
+# remaining entries are left unchecked instead of waiting forever. The threads
+# are daemon threads, so a stat that never returns does not block exit either.
+DEFAULT_STAT_TIMEOUT = 5.0
+
+# Entry statuses. Only non-OK statuses are reported per entry.
+OK = "ok"
+MISSING = "missing"
+CHANGED = "changed"
+TIMEOUT = "timeout"
+UNCHECKED = "unchecked"
+STATUSES = (OK, MISSING, CHANGED, TIMEOUT, UNCHECKED)
+
+
+class _DaemonPool:
+    """
+    Fixed set of daemon threads running blocking calls for an event loop.
+
+    concurrent.futures joins its worker threads when the interpreter exits,
+    so one stat hung for good on CVMFS would keep `biofinder verify` or the
+    server from ever exiting. Daemon threads are abandoned at exit instead.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, workers: int):
+        self.loop = loop
+        self.jobs: "queue.SimpleQueue" = queue.SimpleQueue()
+        self.workers = workers
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f"cvmfs-verify-{i}", daemon=True).start()
+
+    def _work(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            future, func, args = job
+            try:
+                outcome = (func(*args), None)
+            except Exception as e:
+                outcome = (None, e)
+            try:
+                self.loop.call_soon_threadsafe(_settle, future, *outcome)
+            except RuntimeError:
+                return  # the loop closed while this call hung
+
+    def run(self, func, *args) -> asyncio.Future:
+        """Run `func(*args)` on a pool thread; the returned future can be awaited."""
+        future = self.loop.create_future()
+        self.jobs.put((future, func, args))
+        return future
+
+    def shutdown(self):
+        """Let idle threads exit. Threads stuck in a call are not waited for."""
+        for _ in range(self.workers):
+            self.jobs.put(None)
+
+
+def _settle(future: asyncio.Future, result: Any, error: Optional[BaseException]):
+    # The awaiting side may have given up (timeout) already
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def sample_rows(count: int, sample: Optional[int] = None, seed: Optional[int] = None) -> List[int]:
+    """Rows to verify: all of them, or a random sample of `sample` rows."""
+    if sample is None or sample >= count:
+        return list(range(count))
+    return sorted(random.Random(seed).sample(range(count), sample))
+
+
+def cache_age_seconds(generated_at: Optional[str]) -> Optional[float]:
+    """Seconds since the cache's `generated_at` timestamp, or None if unknown."""
+    if not generated_at:
+        return None
+    try:
+        generated = datetime.fromisoformat(generated_at)
+    except ValueError:
+        return None
+    if generated.tzinfo is None:
+        generated = generated.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - generated).total_seconds()
+
+
+async def verify_store(
+    store: ContainerStore,
+    rows: Optional[Sequence[int]] = None,
+    workers: int = DEFAULT_WORKERS,
+    timeout: float = DEFAULT_STAT_TIMEOUT,
+) -> Dict[str, Any]:
+    """
+    Stat the paths of `rows` (default: every row) concurrently.
+
+    Returns:
+        Report dict with 'checked' (number of rows), 'counts' per status,
+        'suspects' (row -> status for every row that is not OK),
+        'root_available', 'verified_at' and 'elapsed_seconds'
+    """
+    rows = range(len(store)) if rows is None else rows
+    workers = max(1, workers)
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    suspects: Dict[int, str] = {}
+    pending = iter(rows)
+
+    async def lane():
+        # One lane per pool thread, each pulling rows off the shared iterator
+        for row in pending:
+            try:
+                st = await asyncio.wait_for(pool.run(os.stat, store.path(row)), timeout)
+            except asyncio.TimeoutError:
+                # The thread is still blocked in stat(): retire this lane
+                suspects[row] = TIMEOUT
+                return
+            except OSError:
+                suspects[row] = MISSING
+                continue
+            if st.st_size != store.size_bytes(row) or st.st_mtime != store.mtime(row):
+                suspects[row] = CHANGED
+
+    pool = _DaemonPool(loop, workers)
+    try:
+        try:
+            root_available = await asyncio.wait_for(pool.run(os.path.isdir, store.cvmfs_root), timeout)
+        except asyncio.TimeoutError:
+            root_available = False
+
+        if root_available:
+            await asyncio.gather(*(lane() for _ in range(workers)))
+        # Left over when the repository is unmounted or every lane hung
+        for row in pending:
+            suspects[row] = UNCHECKED
+    finally:
+        pool.shutdown()
+
+    counts = {status: 0 for status in STATUSES}
+    for status in suspects.values():
+        counts[status] += 1
+    counts[OK] = len(rows) - len(suspects)
+
+    return {
+        'checked': len(rows),
+        'counts': counts,
+        'suspects': suspects,
+        'root_available': root_available,
+        'verified_at': datetime.now(timezone.utc).isoformat(),
+        'elapsed_seconds': time.perf_counter() - start,
+    }
+
+
+def format_age(seconds: Optional[float]) -> str:
+    """Human-readable age, e.g. "3.2 days"."""
+    if seconds is None:
+        return "unknown"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} minutes"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f} hours"
+    return f"{seconds / 86400:.1f} days"
+
+
+def format_verify_output(report: Dict[str, Any], store: ContainerStore, cache_info: Dict[str, Any],
+                         max_listed: int = 50) -> str:
+    """Format the verify command output."""
+    counts = report['counts']
+    lines = [
+        f"Cache generated {cache_info.get('generated_at', 'unknown')} "
+        f"({format_age(cache_age_seconds(cache_info.get('generated_at')))} ago)",
+        f"Verified {report['checked']} of {len(store)} entries in {report['elapsed_seconds']:.2f} s",
+    ]
+    if not report['root_available']:
+        lines.append(f"  CVMFS root {store.cvmfs_root} is not available; nothing was checked")
+        return "\n".join(lines)
+
+    for status in STATUSES:
+        lines.append(f"  {status.capitalize()}: {counts[status]}")
+
+    problems = [(row, status) for row, status in sorted(report['suspects'].items()) if status in (MISSING, CHANGED)]
+    if problems:
+        lines.append("")
+        for row, status in problems[:max_listed]:
+            lines.append(f"  {status:<8} {store.path(row)}")
+        if len(problems) > max_listed:
+            lines.append(f"  ... and {len(problems) - max_listed} more")
+        lines.append("")
+        lines.append("Run 'biofinder scan' to refresh the cache.")
+    return "\n".join(lines)
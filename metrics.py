@@ -0,0 +1,216 @@
+"""
+Request latency and memory metrics for the MCP server.
+
+Every call_tool request adds one sample to its tool's LatencyHistogram: a
+bisect into fixed bucket bounds and a few integer updates, so recording costs
+well under a microsecond. Percentiles are estimated from the buckets only
+when the stats are read (the biofinder://stats resource, or the periodic
+stderr summary).
+
+QueryLog optionally appends every request to a JSONL file, which
+benchmarks/replay.py can play back against a server.
+"""
+
+import bisect
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+class LatencyHistogram:
+    """Request count, error count and latency distribution of one tool."""
+
+    # Upper bucket bounds in microseconds (1-2-5 steps, 10 µs to 10 s); a
+    # final overflow bucket holds anything slower
+    BOUNDS_US = tuple(
+        base * 10 ** exponent for exponent in range(1, 7) for base in (1, 2, 5)
+    ) + (10_000_000,)
+
+    __slots__ = ("buckets", "count", "errors", "total_us", "max_us")
+
+    def __init__(self):
+        self.buckets = [0] * (len(self.BOUNDS_US) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_us = 0.0
+        self.max_us = 0.0
+
+    def record(self, seconds: float, failed: bool = False):
+        """Add one request that took `seconds`."""
+        micros = seconds * 1_000_000
+        self.buckets[bisect.bisect_left(self.BOUNDS_US, micros)] += 1
+        self.count += 1
+        self.total_us += micros
+        if micros > self.max_us:
+            self.max_us = micros
+        if failed:
+            self.errors += 1
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Upper bound (µs) of the bucket holding the `fraction` quantile.
+
+        Estimates are at most one bucket step (2-2.5x) high; the overflow
+        bucket reports the largest latency seen.
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for i, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank and bucket:
+                return min(self.BOUNDS_US[i], self.max_us) if i < len(self.BOUNDS_US) else self.max_us
+        return self.max_us
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts, mean/max and estimated percentiles, plus the non-empty buckets."""
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'mean_us': self.total_us / self.count if self.count else 0.0,
+            'p50_us': self.percentile(0.50),
+            'p90_us': self.percentile(0.90),
+            'p99_us': self.percentile(0.99),
+            'max_us': self.max_us,
+            # "le_<bound>" -> requests at or below that many µs (and above the
+            # previous bound); "inf" holds the overflow
+            'histogram': {
+                (f"le_{self.BOUNDS_US[i]}" if i < len(self.BOUNDS_US) else "inf"): bucket
+                for i, bucket in enumerate(self.buckets) if bucket
+            },
+        }
+
+
+class ToolMetrics:
+    """LatencyHistogram per tool name, for the lifetime of the process."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.tools: Dict[str, LatencyHistogram] = {}
+
+    def record(self, name: str, seconds: float, failed: bool = False):
+        """Add one call of tool `name`."""
+        histogram = self.tools.get(name)
+        if histogram is None:
+            histogram = self.tools[name] = LatencyHistogram()
+        histogram.record(seconds, failed)
+
+    def stats(self) -> Dict[str, Any]:
+        """Uptime and per-tool stats, busiest tool first."""
+        return {
+            'uptime_seconds': time.time() - self.started,
+            'tools': {
+                name: histogram.stats()
+                for name, histogram in sorted(self.tools.items(), key=lambda item: -item[1].count)
+            },
+        }
+
+    def summary(self) -> str:
+        """One-line summary for the periodic stderr log."""
+        parts = [
+            f"{name} n={h.count} p50={h.percentile(0.5) / 1000:.1f}ms p99={h.percentile(0.99) / 1000:.1f}ms"
+            for name, h in sorted(self.tools.items(), key=lambda item: -item[1].count)
+        ]
+        return "; ".join(parts) or "no requests yet"
+
+
+class QueryLog:
+    """
+    Append-only JSONL log of call_tool requests.
+
+    One line per request: `ts` (Unix seconds), `tool`, `arguments`,
+    `latency_ms`, `result_chars` and, for failed calls, `error`. The file is
+    opened in append mode and line buffered, so each record is a single
+    append and several servers may share one log.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "a", buffering=1)
+
+    def write(self, name: str, arguments: Any, seconds: float,
+              result_chars: Optional[int] = None, error: Optional[str] = None):
+        """Append one request."""
+        record = {
+            'ts': time.time(),
+            'tool': name,
+            'arguments': arguments or {},
+            'latency_ms': round(seconds * 1000, 3),
+            'result_chars': result_chars,
+        }
+        if error is not None:
+            record['error'] = error
+        self.file.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size, where /proc provides it."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Peak resident set size of this process.
+
+    Read from VmHWM where /proc has it: ru_maxrss survives exec, so a server
+    spawned by the client would report the client's peak if it were larger.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def memory_usage(top: int = 10) -> Dict[str, Any]:
+    """
+    Current and peak RSS, plus tracemalloc figures if tracing is on.
+
+    Tracing (BIOFINDER_TRACEMALLOC=1) slows every allocation, so it is off by
+    default; when on, the `top` allocation sites by size are listed.
+    """
+    rss = _rss_bytes()
+    peak = peak_rss_bytes()
+    usage: Dict[str, Any] = {
+        'rss_mb': rss / 1e6 if rss is not None else None,
+        'peak_rss_mb': peak / 1e6 if peak is not None else None,
+    }
+
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        statistics = tracemalloc.take_snapshot().statistics("lineno")[:top] if top else []
+        usage['tracemalloc'] = {
+            'current_mb': current / 1e6,
+            'peak_mb': peak / 1e6,
+            'top': [
+                {'where': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                 'size_mb': stat.size / 1e6, 'blocks': stat.count}
+                for stat in statistics
+            ],
+        }
+    else:
+        usage['tracemalloc'] = None
+    return usage
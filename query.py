@@ -1,3 +1,7 @@
+import re
+from functools import lru_cache
+from typing import List
+
 STOP_WORDS = {
 
     # =========================
@@ -121,3 +125,86 @@ STOP_WORDS = {
         "robustly",
     }
 }
+
+
+# =========================
+# Text analysis
+# =========================
+# Shared by the search index build (once per metadata entry) and by queries
+# (once per query), so both sides reduce words to the same terms.
+
+# Every STOP_WORDS category, flattened for membership tests
+ALL_STOP_WORDS = frozenset().union(*STOP_WORDS.values())
+
+# Suffixes stripped by stem(), longest first. Only the first match is removed.
+_SUFFIXES = (
+    "ments", "ment",
+    "ings", "ing",
+    "ions", "ion",
+    "ers", "er",
+    "ies",
+    "ed",
+    "es",
+    "s",
+)
+
+# Shortest stem stem() will produce; shorter results leave the word unchanged
+_MIN_STEM = 3
+
+_TOKEN_RE = re.compile(r"[^\w\s\-]")
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """
+    Light suffix-stripping stemmer.
+
+    Collapses common inflections so that e.g. "aligning", "alignment",
+    "aligner" and "aligned" all become "align". Deliberately much simpler
+    than Porter: it only needs to be consistent between index and query.
+    """
+    if not word.isalpha() or len(word) <= _MIN_STEM:
+        return word
+
+    stemmed = word
+    for suffix in _SUFFIXES:
+        if not word.endswith(suffix):
+            continue
+        if suffix == "s" and word.endswith(("ss", "us", "is")):
+            break
+        candidate = word[:-len(suffix)]
+        if suffix == "ies":
+            candidate += "y"
+        if len(candidate) >= _MIN_STEM:
+            stemmed = candidate
+        break
+
+    # "mapping" -> "mapp" -> "map", but keep "call", "mass", "buzz"
+    if (len(stemmed) > _MIN_STEM and stemmed[-1] == stemmed[-2]
+            and stemmed[-1] not in "aeioulsz" and stemmed != word):
+        stemmed = stemmed[:-1]
+
+    # "sequence"/"sequencing" -> "sequenc", "assembly"/"assembler" -> "assembl"
+    if len(stemmed) > _MIN_STEM and stemmed[-1] in "ey":
+        stemmed = stemmed[:-1]
+
+    return stemmed
+
+
+def analyse(text: str) -> List[str]:
+    """
+    Turn free text into search terms.
+
+    Lowercases, splits on punctuation and whitespace, drops STOP_WORDS and
+    stems what is left. Hyphenated words ("single-cell") are kept whole and
+    also contribute their parts.
+    """
+    terms = []
+    for token in _TOKEN_RE.sub(" ", text.lower()).split():
+        parts = [token]
+        if "-" in token:
+            parts.extend(part for part in token.split("-") if part)
+        for part in parts:
+            if part not in ALL_STOP_WORDS:
+                terms.append(stem(part))
+    return terms
@@ -0,0 +1,81 @@
+"""
+LRU cache of rendered MCP tool responses.
+
+Agents ask for the same few tools (fastqc, samtools, bwa) over and over, and
+each find_tool answer is several kilobytes of formatted text. ResponseCache
+keeps recent answers keyed by tool name, arguments and index generation, so a
+repeated call skips both the lookup and the formatting. Entries of an older
+generation can never be hit again and are dropped by clear() on reload.
+"""
+
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    Bounded LRU mapping of request key -> rendered response.
+
+    The bound is the total number of characters held, not the number of
+    entries: a `get_container_versions samtools` answer is ~100x larger than
+    an `autocomplete` one. The least recently used entries are evicted until
+    a new entry fits; an entry larger than the whole budget is not stored.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(name: str, arguments: Optional[Dict[str, Any]], generation: int) -> Hashable:
+        """Cache key for a tool call. Argument order does not matter."""
+        return (name, json.dumps(arguments or {}, sort_keys=True, default=str), generation)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Cached response for `key`, marking it most recently used, or None."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, response: Any, size: int):
+        """Store a response of `size` characters, evicting old entries to make room."""
+        if size > self.max_chars:
+            return
+
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+        while self.entries and self.size + size > self.max_chars:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+            self.evictions += 1
+
+        self.entries[key] = (response, size)
+        self.size += size
+
+    def clear(self):
+        """Drop every entry. Counters are kept for the lifetime of the process."""
+        self.entries.clear()
+        self.size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'size_chars': self.size,
+            'max_chars': self.max_chars,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
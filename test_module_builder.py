@@ -0,0 +1,156 @@
+"""
+Lmod cache refresh of CVMFSModuleBuilder, with stand-ins for Lmod's
+update_lmod_system_cache_files (via BIOFINDER_LMOD_CACHE_UPDATER) and for the
+`module` command.
+
+    python3 -m pytest -q test_module_builder.py
+"""
+
+import importlib
+import os
+import stat
+
+import pytest
+
+import cvmfs_module_builder
+
+
+# Writes a spider cache and the timestamp the way the real script does, and
+# logs every call. Exits with $FAKE_UPDATER_STATUS if set.
+FAKE_UPDATER = """#!/bin/sh
+echo "$@" >> "$FAKE_UPDATER_LOG"
+if [ -n "$FAKE_UPDATER_STATUS" ]; then
+    echo "spider failed" >&2
+    exit "$FAKE_UPDATER_STATUS"
+fi
+while [ $# -gt 1 ]; do
+    case "$1" in
+        -d) dir="$2"; shift 2 ;;
+        -t) timestamp="$2"; shift 2 ;;
+        *) shift ;;
+    esac
+done
+echo "new spider cache" > "$dir/spiderT.lua"
+touch "$timestamp"
+"""
+
+# Stands in for Lmod's `module` in the fallback path
+FAKE_MODULE = """#!/bin/sh
+echo "$@" >> "$FAKE_MODULE_LOG"
+echo "fake module avail" >&2
+"""
+
+
+def _script(path, content):
+    path.write_text(content)
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return path
+
+
+def _calls(log):
+    return log.read_text().splitlines() if log.exists() else []
+
+
+@pytest.fixture
+def lmod(tmp_path, monkeypatch):
+    """A builder whose module tree, cache directory and updater live in tmp_path."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    updater = _script(bin_dir / "fake_update_lmod_system_cache_files", FAKE_UPDATER)
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+
+    monkeypatch.setenv("BIOFINDER_LMOD_CACHE_UPDATER", str(updater))
+    monkeypatch.setenv("BIOFINDER_LMOD_CACHE_DIR", str(cache_dir))
+    monkeypatch.setenv("FAKE_UPDATER_LOG", str(tmp_path / "updater.log"))
+    monkeypatch.setenv("FAKE_MODULE_LOG", str(tmp_path / "module.log"))
+    # The cache settings are read when the module is imported
+    module = importlib.reload(cvmfs_module_builder)
+    builder = module.CVMFSModuleBuilder()
+    builder.LMOD_MODULES_PATH = tmp_path / "modulefiles"
+    yield builder, tmp_path
+    monkeypatch.undo()
+    importlib.reload(cvmfs_module_builder)
+
+
+def test_cache_and_timestamp_are_swapped_in(lmod):
+    builder, tmp_path = lmod
+    cache_dir = builder.LMOD_CACHE_DIR
+    (cache_dir / "spiderT.lua").write_text("old spider cache\n")
+    builder.LMOD_TIMESTAMP_FILE.write_text("")
+    os.utime(builder.LMOD_TIMESTAMP_FILE, (0, 0))
+
+    module_file = builder._create_module_file("samtools", "1.22--h96c455f_0")
+    refreshed, output = builder._refresh_module_cache([module_file])
+
+    assert refreshed, output
+    assert (cache_dir / "spiderT.lua").read_text() == "new spider cache\n"
+    assert builder.LMOD_TIMESTAMP_FILE.stat().st_mtime > 0
+    # The scratch directory is gone and nothing else was left behind
+    assert sorted(path.name for path in cache_dir.iterdir()) == ["spiderT.lua", "timestamp"]
+    (call,) = _calls(tmp_path / "updater.log")
+    assert call.endswith(str(builder.LMOD_MODULES_PATH))
+
+
+def test_unchanged_module_does_not_regenerate(lmod):
+    builder, tmp_path = lmod
+    module_file = builder._create_module_file("samtools", "1.22--h96c455f_0")
+    # Written well before the first regeneration
+    os.utime(module_file, (module_file.stat().st_atime - 10, module_file.stat().st_mtime - 10))
+    assert builder._refresh_module_cache([module_file])[0]
+
+    # Same content: the file is not rewritten, so the cache is current
+    mtime = module_file.stat().st_mtime
+    assert builder._create_module_file("samtools", "1.22--h96c455f_0") == module_file
+    assert module_file.stat().st_mtime == mtime
+    refreshed, output = builder._refresh_module_cache([module_file])
+
+    assert refreshed
+    assert "up to date" in output
+    assert len(_calls(tmp_path / "updater.log")) == 1
+
+
+def test_failing_updater_leaves_cache_alone(lmod, monkeypatch):
+    builder, tmp_path = lmod
+    cache_dir = builder.LMOD_CACHE_DIR
+    (cache_dir / "spiderT.lua").write_text("old spider cache\n")
+    builder.LMOD_TIMESTAMP_FILE.write_text("old timestamp\n")
+    monkeypatch.setenv("FAKE_UPDATER_STATUS", "3")
+
+    module_file = builder._create_module_file("samtools", "1.22--h96c455f_0")
+    refreshed, output = builder._refresh_module_cache([module_file])
+
+    assert not refreshed
+    assert "spider failed" in output
+    assert (cache_dir / "spiderT.lua").read_text() == "old spider cache\n"
+    assert builder.LMOD_TIMESTAMP_FILE.read_text() == "old timestamp\n"
+    assert sorted(path.name for path in cache_dir.iterdir()) == ["spiderT.lua", "timestamp"]
+
+
+def test_falls_back_to_module_command_without_updater(lmod, monkeypatch):
+    builder, tmp_path = lmod
+    bin_dir = tmp_path / "module-bin"
+    bin_dir.mkdir()
+    _script(bin_dir / "module", FAKE_MODULE)
+    builder.LMOD_CACHE_UPDATER = None
+    monkeypatch.delenv("LMOD_DIR", raising=False)
+    monkeypatch.setenv("PATH", str(bin_dir))
+
+    refreshed, output = builder._refresh_module_cache()
+
+    assert refreshed
+    assert "fake module avail" in output
+    assert _calls(tmp_path / "module.log") == ["--ignore_cache avail"]
+    assert not _calls(tmp_path / "updater.log")
+
+
+def test_no_updater_and_no_module_command(lmod, monkeypatch):
+    builder, tmp_path = lmod
+    builder.LMOD_CACHE_UPDATER = None
+    monkeypatch.delenv("LMOD_DIR", raising=False)
+    monkeypatch.setenv("PATH", str(tmp_path / "empty"))
+
+    refreshed, output = builder._refresh_module_cache()
+
+    assert not refreshed
+    assert "module command not found" in output
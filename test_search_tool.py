@@ -0,0 +1,30 @@
+"""
+Lookup regressions for BioFinderIndex.search_tool, against the bundled data.
+
+    python3 -m pytest -q test_search_tool.py
+"""
+
+import pytest
+
+from biofinder_server import BioFinderIndex
+
+
+@pytest.fixture(scope="module")
+def index():
+    idx = BioFinderIndex()
+    idx.load_data()
+    return idx
+
+
+def test_container_key_variant_beats_metadata_alias(index):
+    # rtg_core is rtg-tools' biotools id, but the query's -/_ variant names
+    # the rtg-core container, which the old linear scans returned
+    result = index.search_tool("rtg_core")
+    assert result['metadata']['id'] == "rtg-tools"
+    assert {container['tool_name'] for container in result['containers']} == {"rtg-core"}
+
+
+def test_metadata_entry_container_is_the_fallback(index):
+    result = index.search_tool("rtg-tools")
+    assert result['metadata']['id'] == "rtg-tools"
+    assert {container['tool_name'] for container in result['containers']} == {"rtg-tools"}